@@ -1,9 +1,12 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
-from auth.password import verify_password
-from dependencies import CurrentUserRefreshDeps, TokenServiceDeps, UserCrudDeps
-from exceptions.http import IncorrectPassword_401
-from schemas.auth import LoginForm, TokenPair
+from auth.password import verify_password_async
+from auth.refresh import issue_refresh_token, rotate_refresh_token
+from auth.revocation import ensure_not_revoked
+from dependencies import SessionDeps, TokenServiceDeps, UserCrudDeps
+from exceptions.http import IncorrectPassword_401, InvalidToken_401, RefreshTokenReused_401
+from schemas.auth import LoginForm, OAuth2Token, TokenPair
 
 router = APIRouter(
     tags=["auth"],
@@ -18,16 +21,17 @@ router = APIRouter(
 )
 async def login(
     form_data: LoginForm,
+    session: SessionDeps,
     user_crud: UserCrudDeps,
     token_service: TokenServiceDeps,
 ):
     user = await user_crud.get_by_email(form_data.username)
-    if not verify_password(form_data.password, user.password):
+    if not await verify_password_async(form_data.password, user.password):
         raise IncorrectPassword_401
 
     token_pair = await token_service.generate_token_pair(
         {"id": user.id},
-        {"id": user.id},
+        await issue_refresh_token(session, user.id),
     )
 
     return token_pair
@@ -39,12 +43,26 @@ async def login(
     summary="刷新 token",
 )
 async def refresh(
+    token: OAuth2Token,
+    session: SessionDeps,
     token_service: TokenServiceDeps,
-    current_user: CurrentUserRefreshDeps,
 ):
-    token_pair = await token_service.generate_token_pair(
-        {"id": current_user.id},
-        {"id": current_user.id},
-    )
+    # 只看已簽章的 claim 與 RefreshToken 表，不查 User
+    payload = await token_service.decode_token(token, usage="refresh")
+    user_id: int | None = payload.get("id")
+    if user_id is None:
+        raise InvalidToken_401
+    await ensure_not_revoked(session, payload)
+
+    refresh_payload = await rotate_refresh_token(session, payload)
+    if refresh_payload is None:
+        # 家族撤銷要隨交易 commit 才會保存，所以直接回傳錯誤而不是 raise
+        return JSONResponse(
+            {"detail": RefreshTokenReused_401.detail},
+            status_code=RefreshTokenReused_401.status_code,
+            headers=RefreshTokenReused_401.headers,
+        )
+
+    token_pair = await token_service.generate_token_pair({"id": user_id}, refresh_payload)
 
     return token_pair
@@ -0,0 +1,32 @@
+import time
+
+from fastapi import APIRouter, Request
+from sqlalchemy import text
+
+from auth.password import get_password_pool
+from database.session import engine, pool_monitor
+
+router = APIRouter(tags=["health"], prefix="/api/health")
+
+
+@router.get(
+    "",
+    summary="健康檢查",
+)
+async def health(request: Request):
+    start = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        database_ok = True
+    except Exception:
+        database_ok = False
+    return {
+        "database": {
+            "ok": database_ok,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+            **pool_monitor.stats(),
+        },
+        "password_hash": get_password_pool().stats(),
+        "startup": getattr(request.app.state, "startup", None),
+    }
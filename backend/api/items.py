@@ -1,32 +1,132 @@
-from fastapi import APIRouter, status
+from typing import Literal
 
-from dependencies import CurrentUserAccessDeps, ItemCrudDeps
-from schemas.item import ItemCreate, ItemRead, ItemUpdate
-from schemas.misc import Pagination
+from fastapi import APIRouter, Query, Request, status
+from pydantic import BaseModel
+
+from cache.response import items_namespace
+from config import settings
+from dependencies import (
+    CurrentUserIdAccessDeps,
+    ItemCrudDeps,
+    ItemReadCrudDeps,
+    ResponseCacheDeps,
+)
+from exceptions.http import BulkTooLarge_413
+from schemas.item import ItemBulkDelete, ItemBulkUpdate, ItemCreate, ItemRead, ItemUpdate
+from schemas.misc import (
+    MAX_PAGE_SIZE,
+    CursorPagination,
+    Pagination,
+    decode_cursor,
+    encode_cursor,
+)
+from schemas.serialization import build_model, build_models, json_response
 
 router = APIRouter(tags=["items"], prefix="/api/items")
 
 
 @router.get(
     "",
-    response_model=Pagination[ItemRead],
+    response_model=Pagination[ItemRead] | CursorPagination[ItemRead],
     summary="取得使用者的所有商品 (分頁)",
 )
 async def get_user_all_items(
+    request: Request,
+    item_crud: ItemReadCrudDeps,
+    current_user_id: CurrentUserIdAccessDeps,
+    response_cache: ResponseCacheDeps,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    mode: Literal["offset", "cursor"] = "offset",
+    after: str | None = None,
+    with_total: bool = False,
+):
+    async def build() -> BaseModel:
+        # 有帶 after 游標就視為 cursor 模式
+        if mode == "cursor" or after is not None:
+            after_id = decode_cursor(after) if after is not None else None
+            # 多拿一筆來判斷是否還有下一頁
+            items = await item_crud.get_rows_by_user_id_after(
+                current_user_id, limit=page_size + 1, after_id=after_id
+            )
+            has_next = len(items) > page_size
+            items = items[:page_size]
+            total = await item_crud.count_by_user_id(current_user_id) if with_total else None
+            return CursorPagination[ItemRead].model_construct(
+                total=total,
+                page_size=page_size,
+                next_cursor=encode_cursor(items[-1].id) if has_next else None,
+                items=build_models(ItemRead, items),
+            )
+
+        offset = (page - 1) * page_size
+        items = await item_crud.get_rows_by_user_id(current_user_id, limit=page_size, offset=offset)
+        total = await item_crud.count_by_user_id(current_user_id)
+        return Pagination[ItemRead].model_construct(
+            total=total,
+            page=page,
+            page_size=page_size,
+            items=build_models(ItemRead, items),
+        )
+
+    return await response_cache.respond(request, items_namespace(current_user_id), build)
+
+
+def check_bulk_size(size: int) -> None:
+    if size > settings.get_settings().bulk_max_items:
+        raise BulkTooLarge_413
+
+
+# 批次路由要註冊在 /{item_id} 之前，否則 /bulk 會先被當成 item_id 比對
+@router.post(
+    "/bulk",
+    response_model=list[ItemRead],
+    status_code=status.HTTP_201_CREATED,
+    response_description="成功批次建立使用者的商品",
+    summary="批次建立使用者的商品",
+)
+async def create_user_items_bulk(
+    items_data: list[ItemCreate],
+    item_crud: ItemCrudDeps,
+    current_user_id: CurrentUserIdAccessDeps,
+):
+    check_bulk_size(len(items_data))
+    if not items_data:
+        return []
+    items = await item_crud.create_many(items_data, current_user_id)
+    return json_response(build_models(ItemRead, items), status.HTTP_201_CREATED)
+
+
+@router.patch(
+    "/bulk",
+    response_model=list[ItemRead],
+    summary="批次更新使用者的商品",
+)
+async def update_user_items_bulk(
+    items_data: list[ItemBulkUpdate],
+    item_crud: ItemCrudDeps,
+    current_user_id: CurrentUserIdAccessDeps,
+):
+    check_bulk_size(len(items_data))
+    if not items_data:
+        return []
+    items = await item_crud.update_many(items_data, current_user_id)
+    return json_response(build_models(ItemRead, items))
+
+
+@router.delete(
+    "/bulk",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="批次刪除使用者的商品",
+)
+async def delete_user_items_bulk(
+    delete_data: ItemBulkDelete,
     item_crud: ItemCrudDeps,
-    current_user: CurrentUserAccessDeps,
-    page: int = 1,
-    page_size: int = 20,
+    current_user_id: CurrentUserIdAccessDeps,
 ):
-    offset = (page - 1) * page_size
-    items = await item_crud.get_all_by_user_id(current_user.id, limit=page_size, offset=offset)
-    total = await item_crud.count_by_user_id(current_user.id)
-    return Pagination[ItemRead](
-        total=total,
-        page=page,
-        page_size=page_size,
-        items=items,
-    )
+    check_bulk_size(len(delete_data.ids))
+    if delete_data.ids:
+        await item_crud.delete_many(delete_data.ids, current_user_id)
 
 
 @router.get(
@@ -35,11 +135,17 @@ async def get_user_all_items(
     summary="取得使用者的指定商品",
 )
 async def get_user_item(
+    request: Request,
     item_id: int,
-    item_crud: ItemCrudDeps,
-    current_user: CurrentUserAccessDeps,
+    item_crud: ItemReadCrudDeps,
+    current_user_id: CurrentUserIdAccessDeps,
+    response_cache: ResponseCacheDeps,
 ):
-    return await item_crud.get_by_id_and_validate(item_id, current_user.id)
+    async def build() -> BaseModel:
+        item = await item_crud.get_row_by_id_and_validate(item_id, current_user_id)
+        return build_model(ItemRead, item)
+
+    return await response_cache.respond(request, items_namespace(current_user_id), build)
 
 
 @router.post(
@@ -52,9 +158,10 @@ async def get_user_item(
 async def create_user_item(
     item_data: ItemCreate,
     item_crud: ItemCrudDeps,
-    current_user: CurrentUserAccessDeps,
+    current_user_id: CurrentUserIdAccessDeps,
 ):
-    return await item_crud.create(item_data, current_user.id)
+    item = await item_crud.create(item_data, current_user_id)
+    return json_response(build_model(ItemRead, item), status.HTTP_201_CREATED)
 
 
 @router.patch(
@@ -66,10 +173,10 @@ async def update_user_item(
     item_id: int,
     item_data: ItemUpdate,
     item_crud: ItemCrudDeps,
-    current_user: CurrentUserAccessDeps,
+    current_user_id: CurrentUserIdAccessDeps,
 ):
-    await item_crud.get_by_id_and_validate(item_id, current_user.id)
-    return await item_crud.update_partial(item_id, item_data)
+    item = await item_crud.update_partial(item_id, current_user_id, item_data)
+    return json_response(build_model(ItemRead, item))
 
 
 @router.delete(
@@ -80,7 +187,6 @@ async def update_user_item(
 async def delete_user_item(
     item_id: int,
     item_crud: ItemCrudDeps,
-    current_user: CurrentUserAccessDeps,
+    current_user_id: CurrentUserIdAccessDeps,
 ):
-    await item_crud.get_by_id_and_validate(item_id, current_user.id)
-    await item_crud.delete(item_id)
+    await item_crud.delete(item_id, current_user_id)
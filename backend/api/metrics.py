@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from metrics.multiprocess import collect
+from metrics.registry import render
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def metrics():
+    return PlainTextResponse(
+        render(collect()), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
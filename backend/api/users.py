@@ -1,6 +1,22 @@
-from fastapi import APIRouter, status
+from collections.abc import AsyncIterator
+from typing import Literal
 
-from dependencies import CurrentUserAccessDeps, UserCrudDeps
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from cache.response import user_namespace
+from crud.user import UserCrud
+from dependencies import (
+    CurrentUserAccessDeps,
+    ResponseCacheDeps,
+    SessionFactoryDeps,
+    UserCrudDeps,
+    UserPathReadCrudDeps,
+    UserReadCrudDeps,
+)
+from schemas.misc import MAX_PAGE_SIZE, CursorPagination, decode_cursor, encode_cursor
+from schemas.serialization import build_model, build_models, get_adapter, json_response
 from schemas.user import UserCreate, UserRead, UserUpdate, UserUpdatePassword
 
 router = APIRouter(tags=["users"], prefix="/api/users")
@@ -11,17 +27,67 @@ router = APIRouter(tags=["users"], prefix="/api/users")
     response_model=UserRead,
     summary="查詢指定使用者",
 )
-async def get_user_by_id(user_id: int, user_crud: UserCrudDeps):
-    return await user_crud.get_by_id(user_id)
+async def get_user_by_id(
+    request: Request,
+    user_id: int,
+    user_crud: UserPathReadCrudDeps,
+    response_cache: ResponseCacheDeps,
+):
+    async def build() -> UserRead:
+        return build_model(UserRead, await user_crud.get_row_by_id(user_id))
+
+    return await response_cache.respond(request, user_namespace(user_id), build)
+
+
+async def stream_users(
+    session_factory: async_sessionmaker[AsyncSession], response_format: Literal["json", "ndjson"]
+) -> AsyncIterator[bytes]:
+    # 一次編碼一個 batch，整張表不會同時存在記憶體中
+    user_adapter = get_adapter(UserRead)
+    first = True
+    if response_format == "json":
+        yield b"["
+    async with session_factory() as session:
+        async for rows in UserCrud(session).stream_all():
+            encoded = [user_adapter.dump_json(build_model(UserRead, row)) for row in rows]
+            if response_format == "ndjson":
+                yield b"\n".join(encoded) + b"\n"
+            else:
+                yield (b"" if first else b",") + b",".join(encoded)
+            first = False
+    if response_format == "json":
+        yield b"]"
 
 
 @router.get(
     "",
-    response_model=list[UserRead],
-    summary="取得所有使用者",
+    response_model=list[UserRead] | CursorPagination[UserRead],
+    summary="取得所有使用者 (串流或分頁)",
 )
-async def get_all_users(user_crud: UserCrudDeps):
-    return await user_crud.get_all()
+async def get_all_users(
+    user_crud: UserReadCrudDeps,
+    session_factory: SessionFactoryDeps,
+    response_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    page_size: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+):
+    # 有帶 page_size 或 after 時走 keyset 分頁
+    if page_size is not None or after is not None:
+        page_size = page_size or 20
+        after_id = decode_cursor(after) if after is not None else None
+        users = await user_crud.get_page(limit=page_size + 1, after_id=after_id)
+        has_next = len(users) > page_size
+        users = users[:page_size]
+        page = CursorPagination[UserRead].model_construct(
+            page_size=page_size,
+            next_cursor=encode_cursor(users[-1].id) if has_next else None,
+            items=build_models(UserRead, users),
+        )
+        return json_response(page)
+
+    # 否則串流整張表 (預設為 JSON array，與原本 list[UserRead] 的格式相同)
+    media_type = "application/x-ndjson" if response_format == "ndjson" else "application/json"
+    return StreamingResponse(stream_users(session_factory, response_format), media_type=media_type)
 
 
 @router.post(
@@ -35,7 +101,8 @@ async def create_user(
     user_data: UserCreate,
     user_crud: UserCrudDeps,
 ):
-    return await user_crud.create(user_data)
+    user = await user_crud.create(user_data)
+    return json_response(build_model(UserRead, user), status.HTTP_201_CREATED)
 
 
 @router.patch(
@@ -48,7 +115,8 @@ async def update_user(
     user_crud: UserCrudDeps,
     current_user: CurrentUserAccessDeps,
 ):
-    return await user_crud.update_partial(current_user.id, user_data)
+    user = await user_crud.update_partial(current_user.id, user_data)
+    return json_response(build_model(UserRead, user))
 
 
 @router.patch(
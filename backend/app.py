@@ -1,19 +1,76 @@
+import asyncio
+import contextlib
+import logging
+import os
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from api.auth import router as auth_router
 from api.config import router as config_router
+from api.health import router as health_router
 from api.items import router as items_router
+from api.metrics import router as metrics_router
 from api.users import router as users_router
-from database.session import close_db, init_db
+from auth.password import close_password_pool
+from auth.refresh import purge_periodically
+from config.settings import get_settings
+from database.session import AsyncSessionLocal, close_db, get_replica_router, init_db
+from metrics.http import MetricsMiddleware
+from metrics.multiprocess import flush_periodically, get_metrics_store
+from metrics.registry import REGISTRY
+from metrics.sql import QueryStatsMiddleware
+
+logger = logging.getLogger("uvicorn.error")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    started = time.perf_counter()
+    _settings = get_settings()
+    init_mode = _settings.db_init_mode
+    # skip 表示 schema 已由 main.py 或 `python -m database.cli init` 處理好
+    if init_mode != "skip":
+        await init_db()
+    # replica 分流的設定有誤 (例如多 worker 卻沒有共用的回應快取) 時在啟動就失敗
+    get_replica_router()
+    app.state.startup = {
+        "pid": os.getpid(),
+        "db_init_mode": init_mode,
+        "lifespan_seconds": round(time.perf_counter() - started, 4),
+        # 此 worker 從啟動到可以接受請求所用的 CPU 時間 (含 import)
+        "cpu_seconds": round(time.process_time(), 4),
+        "budget_seconds": _settings.startup_budget_seconds,
+    }
+    if app.state.startup["cpu_seconds"] > _settings.startup_budget_seconds:
+        # 用 `python -m performance.importtime` 找出是哪些 import 變慢
+        logger.warning("Worker startup over budget: %s", app.state.startup)
+    else:
+        logger.info("Worker startup: %s", app.state.startup)
+
+    background: list[asyncio.Task] = []
+    store = get_metrics_store()
+    if store is not None:
+        background.append(
+            asyncio.create_task(flush_periodically(store, _settings.metrics_flush_seconds))
+        )
+    if _settings.refresh_token_purge_seconds > 0:
+        background.append(
+            asyncio.create_task(
+                purge_periodically(AsyncSessionLocal, _settings.refresh_token_purge_seconds)
+            )
+        )
     yield
+    for task in background:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if store is not None:
+        # worker 結束前寫出最後一次，counter 才不會少算
+        store.write(REGISTRY.snapshot())
     await close_db()
+    close_password_pool()
 
 
 app = FastAPI(
@@ -23,8 +80,15 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+if get_settings().sql_instrumentation:
+    app.add_middleware(
+        QueryStatsMiddleware, n_plus_one_threshold=get_settings().n_plus_one_threshold
+    )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(items_router)
 app.include_router(users_router)
 app.include_router(config_router)
+app.include_router(health_router)
+app.include_router(metrics_router)
@@ -0,0 +1,43 @@
+import time
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache.ttl import TTLCache
+from config import settings
+from database.events import run_after_commit
+from schemas.user import UserRead
+
+# 每次失效都會 +1，用來丟棄「查詢期間身分已被修改」的回填
+_invalidation_count = 0
+
+
+@lru_cache
+def get_identity_cache() -> TTLCache[int, UserRead]:
+    _settings = settings.get_settings()
+    return TTLCache(_settings.identity_cache_maxsize, _settings.identity_cache_ttl_seconds)
+
+
+def identity_version() -> int:
+    return _invalidation_count
+
+
+def cache_identity(identity: UserRead, payload: dict[str, Any], version: int) -> None:
+    if version != _invalidation_count:
+        return
+    # 快取存活時間不超過 token 的剩餘效期
+    ttl = payload["exp"] - time.time() if "exp" in payload else None
+    get_identity_cache().set(identity.id, identity, ttl)
+
+
+def _pop_identity(user_id: int) -> None:
+    global _invalidation_count
+    _invalidation_count += 1
+    get_identity_cache().pop(user_id)
+
+
+def invalidate_identity(session: AsyncSession, user_id: int) -> None:
+    # 立即失效一次，commit 後再失效一次，避免交易期間被其他 request 用舊資料回填
+    _pop_identity(user_id)
+    run_after_commit(session, lambda: _pop_identity(user_id))
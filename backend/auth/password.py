@@ -1,6 +1,17 @@
+import asyncio
+import contextlib
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any
+
 import bcrypt
 from pydantic import SecretStr
 
+from config import settings
+from exceptions.http import ServiceBusy_503
+from metrics.registry import REGISTRY, Counter, Gauge, Labels
+
 
 def resolve_secret(value: str | SecretStr) -> str:
     return value.get_secret_value() if isinstance(value, SecretStr) else value
@@ -14,3 +25,101 @@ def hash_password(password: str | SecretStr) -> str:
 def verify_password(plain: str, hashed: str | SecretStr) -> bool:
     resolved_hashed = resolve_secret(hashed)
     return bcrypt.checkpw(plain.encode("utf-8"), resolved_hashed.encode("utf-8"))
+
+
+class PasswordWorkerPool:
+    """bcrypt 專用的有界 thread pool。
+
+    bcrypt 在計算時會釋放 GIL，所以丟到 thread 就不會卡住 event loop；
+    同時限制排隊數量，滿了就回 503，避免登入風暴把記憶體與延遲一起拖垮。
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="bcrypt")
+        # 以下計數只會在 event loop thread 中變動，不需要 lock
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.max_workers)
+
+    async def run[T](self, func: Callable[..., T], *args: Any) -> T:
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            raise ServiceBusy_503
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self.executor.submit(func, *args)
+        # 在 thread 真正結束時才釋放名額：等待的請求被取消時 bcrypt 仍在 thread 中執行
+        future.add_done_callback(lambda done: self.release_threadsafe(loop, done))
+        return await asyncio.wrap_future(future)
+
+    def release_threadsafe(self, loop: asyncio.AbstractEventLoop, future: Future) -> None:
+        # done callback 在 worker thread 中執行，計數交回 event loop thread 更新
+        with contextlib.suppress(RuntimeError):  # event loop 已關閉
+            loop.call_soon_threadsafe(self.release, future)
+
+    def release(self, future: Future) -> None:
+        self.pending -= 1
+        # 失敗或被取消的工作不算完成
+        if not future.cancelled() and future.exception() is None:
+            self.completed += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.pending,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_password_pool() -> PasswordWorkerPool:
+    _settings = settings.get_settings()
+    return PasswordWorkerPool(_settings.password_hash_workers, _settings.password_hash_max_queue)
+
+
+def collect_password_pool() -> dict[Labels, float]:
+    # 還沒有人用過 bcrypt 時不必為了回報 metrics 建立 thread pool
+    if not get_password_pool.cache_info().currsize:
+        return {}
+    pool = get_password_pool()
+    return {("in_flight",): pool.pending, ("queued",): pool.queued}
+
+
+PASSWORD_HASH_TASKS = REGISTRY.register(
+    Gauge(
+        "password_hash_tasks",
+        "bcrypt tasks currently running or waiting in the worker pool",
+        ("state",),
+        collect=collect_password_pool,
+    )
+)
+PASSWORD_HASH_REJECTED = REGISTRY.register(
+    Counter("password_hash_rejected_total", "bcrypt tasks rejected because the queue was full")
+)
+
+
+def close_password_pool() -> None:
+    if get_password_pool.cache_info().currsize:
+        get_password_pool().shutdown()
+        get_password_pool.cache_clear()
+
+
+async def hash_password_async(password: str | SecretStr) -> str:
+    return await get_password_pool().run(hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str | SecretStr) -> bool:
+    return await get_password_pool().run(verify_password, plain, hashed)
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+import uuid
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from cache.ttl import TTLCache
+from config import settings
+from database.events import run_after_commit
+from exceptions.http import InvalidToken_401, RevokedToken_401
+from models.refresh_token import RefreshToken
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class RefreshTokenStore:
+    """refresh token 輪替的記憶體熱快取。
+
+    真正的狀態在 `RefreshToken` 表 (以 jti 主鍵查找)，這裡只記住本 worker 已知
+    被撤銷的家族與已經用過的 jti，讓重放的 token 不必查資料庫就能擋下。
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.revoked_families = TTLCache[str, bool](maxsize, ttl)
+        self.used_tokens = TTLCache[str, str](maxsize, ttl)
+
+    def is_family_revoked(self, family_id: str) -> bool:
+        return self.revoked_families.get(family_id) is not None
+
+    def is_used(self, jti: str) -> bool:
+        return self.used_tokens.get(jti) is not None
+
+
+@lru_cache
+def get_refresh_token_store() -> RefreshTokenStore:
+    _settings = settings.get_settings()
+    return RefreshTokenStore(
+        _settings.token_cache_maxsize, _settings.refresh_token_expire_minutes * 60
+    )
+
+
+async def issue_refresh_token(
+    session: AsyncSession, user_id: int, family_id: str | None = None
+) -> dict[str, Any]:
+    """登記一個新的 refresh token，回傳要放進 payload 的 claim。
+
+    `family_id` 為 None 表示新的登入，會開一個新家族。
+    """
+    _settings = settings.get_settings()
+    jti = uuid.uuid4().hex
+    family_id = family_id or uuid.uuid4().hex
+    session.add(
+        RefreshToken(
+            jti=jti,
+            family_id=family_id,
+            user_id=user_id,
+            expires_at=time.time() + _settings.refresh_token_expire_minutes * 60,
+            used=False,
+            revoked=False,
+        )
+    )
+    return {"id": user_id, "jti": jti, "fam": family_id}
+
+
+async def revoke_family(session: AsyncSession, family_id: str) -> None:
+    await session.execute(
+        update(RefreshToken).where(RefreshToken.family_id == family_id).values(revoked=True)
+    )
+    run_after_commit(
+        session, lambda: get_refresh_token_store().revoked_families.set(family_id, True)
+    )
+
+
+async def rotate_refresh_token(
+    session: AsyncSession, payload: dict[str, Any]
+) -> dict[str, Any] | None:
+    """用掉 payload 對應的 refresh token 並簽發同家族的下一個。
+
+    token 已經用過 (或不存在) 代表被重放，會撤銷整個家族並回傳 None；
+    呼叫端必須讓交易 commit，撤銷才會保存下來。
+    """
+    user_id: int = payload["id"]
+    jti: str | None = payload.get("jti")
+    family_id: str | None = payload.get("fam")
+    if jti is None or family_id is None:
+        # 輪替機制上線前簽發的 token，請使用者重新登入
+        raise InvalidToken_401
+
+    store = get_refresh_token_store()
+    if store.is_family_revoked(family_id):
+        raise RevokedToken_401
+    if store.is_used(jti):
+        await revoke_family(session, family_id)
+        return None
+
+    # 以主鍵條件式更新，同時完成查找與標記，多個 worker 併發也只有一個會成功
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == jti,
+            RefreshToken.user_id == user_id,
+            RefreshToken.used.is_(False),
+            RefreshToken.revoked.is_(False),
+        )
+        .values(used=True)
+        .returning(RefreshToken.jti)
+    )
+    if result.scalar_one_or_none() is None:
+        await revoke_family(session, family_id)
+        return None
+
+    run_after_commit(session, lambda: store.used_tokens.set(jti, family_id))
+    return await issue_refresh_token(session, user_id, family_id)
+
+
+async def purge_expired_refresh_tokens(session: AsyncSession) -> int:
+    """刪掉已過期的 refresh token 紀錄 (過期的 token 本身就無法通過驗證)。"""
+    result = await session.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at < time.time())
+        .returning(RefreshToken.jti)
+    )
+    return len(result.all())
+
+
+async def purge_periodically(
+    session_factory: async_sessionmaker[AsyncSession], interval: float
+) -> None:
+    # 每次 refresh 都會新增一列，定期清掉過期的紀錄，資料表才不會無限成長
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory.begin() as session:
+                purged = await purge_expired_refresh_tokens(session)
+        except (SQLAlchemyError, OSError):
+            # 資料庫暫時連不上時等下一輪再試，不讓背景工作結束
+            logger.exception("Failed to purge expired refresh tokens")
+            continue
+        if purged:
+            logger.info("Purged %d expired refresh tokens", purged)
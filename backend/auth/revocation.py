@@ -0,0 +1,86 @@
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database.events import run_after_commit
+from exceptions.http import RevokedToken_401
+from models.revocation import TokenRevocation
+
+
+class RevocationStore:
+    """記憶體中的 token 撤銷清單 (user_id → revoked_before)。
+
+    只有改過密碼或被刪除的使用者才會出現在清單中，所以非常小。
+    每隔 `refresh_seconds` 從 `TokenRevocation` 表增量同步一次，讓其他 worker 的撤銷也會生效；
+    超過 token 最長效期的紀錄不再有意義，同步時順便清掉。
+    """
+
+    def __init__(self, refresh_seconds: float, retention_seconds: float) -> None:
+        self.refresh_seconds = refresh_seconds
+        self.retention_seconds = retention_seconds
+        self.revoked_before: dict[int, float] = {}
+        self.last_refresh = float("-inf")
+        self.synced_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def is_revoked(self, user_id: int, iat: float) -> bool:
+        revoked_before = self.revoked_before.get(user_id)
+        return revoked_before is not None and iat < revoked_before
+
+    def mark(self, user_id: int, revoked_before: float) -> None:
+        self.revoked_before[user_id] = max(revoked_before, self.revoked_before.get(user_id, 0.0))
+
+    async def refresh_if_stale(self, session: AsyncSession) -> None:
+        if time.monotonic() - self.last_refresh < self.refresh_seconds:
+            return
+        async with self.lock:
+            if time.monotonic() - self.last_refresh < self.refresh_seconds:
+                return
+            # 往回多抓一個同步週期，容忍各 worker 之間的時鐘誤差
+            since = self.synced_until - self.refresh_seconds
+            result = await session.execute(
+                select(
+                    TokenRevocation.user_id,
+                    TokenRevocation.revoked_before,
+                    TokenRevocation.updated_at,
+                ).where(TokenRevocation.updated_at > since)
+            )
+            for user_id, revoked_before, updated_at in result.tuples():
+                self.mark(user_id, revoked_before)
+                self.synced_until = max(self.synced_until, updated_at)
+            oldest = time.time() - self.retention_seconds
+            self.revoked_before = {
+                user_id: revoked_before
+                for user_id, revoked_before in self.revoked_before.items()
+                if revoked_before > oldest
+            }
+            self.last_refresh = time.monotonic()
+
+
+@lru_cache
+def get_revocation_store() -> RevocationStore:
+    _settings = settings.get_settings()
+    retention_minutes = max(
+        _settings.access_token_expire_minutes, _settings.refresh_token_expire_minutes
+    )
+    return RevocationStore(_settings.revocation_refresh_seconds, retention_minutes * 60)
+
+
+async def ensure_not_revoked(session: AsyncSession, payload: dict[str, Any]) -> None:
+    store = get_revocation_store()
+    await store.refresh_if_stale(session)
+    # 沒有 iat 的舊 token 視為最早簽發
+    if store.is_revoked(payload["id"], payload.get("iat", 0)):
+        raise RevokedToken_401
+
+
+async def revoke_tokens(session: AsyncSession, user_id: int) -> None:
+    """讓該使用者目前所有的 token 失效 (改密碼、刪除帳號時呼叫)。"""
+    now = round(time.time(), 3)
+    await session.merge(TokenRevocation(user_id=user_id, revoked_before=now, updated_at=now))
+    run_after_commit(session, lambda: get_revocation_store().mark(user_id, now))
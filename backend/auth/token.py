@@ -1,41 +1,128 @@
-from datetime import UTC, datetime, timedelta
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
 from functools import lru_cache
 from typing import Any, Literal
 
-from jose import ExpiredSignatureError, JWTError, jwt
-
+from cache.ttl import TTLCache
 from config import settings
 from exceptions.http import ExpiredToken_401, InvalidToken_401
+from metrics.registry import REGISTRY, Histogram
 from schemas.auth import TokenPair
 
+type TokenUsage = Literal["access", "refresh"]
+
+JWT_VERIFY_SECONDS = REGISTRY.register(
+    Histogram(
+        "jwt_verify_seconds",
+        "Time spent verifying JWTs, by verified-token cache result",
+        ("cache",),
+        buckets=(1e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3),
+    )
+)
+
+
+def b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64url_decode(data: bytes) -> bytes:
+    # 嚴格解碼：非字母表字元、補位的 `=`、最後一個字元多出的位元都視為錯誤，
+    # 同一份資料只有一種合法編碼，不同的 token 字串不會驗證成同一個 token (各佔一個快取位置)
+    decoded = base64.b64decode(data + b"=" * (-len(data) % 4), altchars=b"-_", validate=True)
+    if b64url_encode(decoded) != data:
+        raise ValueError("Non-canonical base64url segment")
+    return decoded
+
+
+class HS256Codec:
+    """預先建好金鑰的 HS256 JWT 簽章 / 驗證器，每種 usage 一個。
+
+    相較 python-jose 每次都要走一遍通用的金鑰解析與 claim 檢查，
+    這裡直接複製已載入金鑰的 HMAC 物件來計算簽章；產生的 token 仍是標準 JWT。
+    驗證過的 token 會放進快取直到 `exp`，同一個 token 再次出現時不必重算 HMAC。
+    """
+
+    header = b64url_encode(b'{"alg":"HS256","typ":"JWT"}')
+
+    def __init__(self, secret: str, expire_minutes: float, cache_maxsize: int) -> None:
+        self.mac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self.expire_minutes = expire_minutes
+        self.verified = TTLCache[str, dict[str, Any]](cache_maxsize, expire_minutes * 60)
+
+    def signature(self, signing_input: bytes) -> bytes:
+        mac = self.mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def sign(self, payload: dict[str, Any]) -> str:
+        body = b64url_encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        signing_input = self.header + b"." + body
+        return (signing_input + b"." + b64url_encode(self.signature(signing_input))).decode()
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """驗證簽章與效期並回傳 payload (快取中的 dict，呼叫端請勿修改)。"""
+        start = time.perf_counter()
+        payload = self.verified.get(token)
+        if payload is not None:
+            JWT_VERIFY_SECONDS.observe(time.perf_counter() - start, "hit")
+            return payload
+        try:
+            header, body, signature = token.encode("ascii").split(b".")
+            if header != self.header and json.loads(b64url_decode(header)).get("alg") != "HS256":
+                raise InvalidToken_401
+            if not hmac.compare_digest(
+                b64url_decode(signature), self.signature(header + b"." + body)
+            ):
+                raise InvalidToken_401
+            payload = json.loads(b64url_decode(body))
+        except (ValueError, binascii.Error, AttributeError) as err:
+            raise InvalidToken_401 from err
+        if not isinstance(payload, dict):
+            raise InvalidToken_401
+        exp = payload.get("exp")
+        if not isinstance(exp, int | float):
+            raise InvalidToken_401
+        remaining = exp - time.time()
+        if remaining <= 0:
+            raise ExpiredToken_401  # ! 前端要負責 redirect 到 /refresh
+        self.verified.set(token, payload, remaining)
+        JWT_VERIFY_SECONDS.observe(time.perf_counter() - start, "miss")
+        return payload
+
 
 class TokenService:
     def __init__(self):
         _settings = settings.get_settings()
-        self.config: dict[str, dict[str, Any]] = {
-            "access": {
-                "secret": _settings.access_token_secret,
-                "expire_minutes": _settings.access_token_expire_minutes,
-            },
-            "refresh": {
-                "secret": _settings.refresh_token_secret,
-                "expire_minutes": _settings.refresh_token_expire_minutes,
-            },
+        self.codecs: dict[TokenUsage, HS256Codec] = {
+            "access": HS256Codec(
+                _settings.access_token_secret,
+                _settings.access_token_expire_minutes,
+                _settings.token_cache_maxsize,
+            ),
+            "refresh": HS256Codec(
+                _settings.refresh_token_secret,
+                _settings.refresh_token_expire_minutes,
+                _settings.token_cache_maxsize,
+            ),
         }
 
-    async def generate_token(
-        self, payload: dict[str, Any], *, usage: Literal["access", "refresh"]
-    ) -> str:
-        secret: str = self.config[usage]["secret"]
-        expire_minutes: float = self.config[usage]["expire_minutes"]
+    async def generate_token(self, payload: dict[str, Any], *, usage: TokenUsage) -> str:
+        codec = self.codecs[usage]
+        now = time.time()
         to_encode_payload = payload.copy()
         to_encode_payload.update(
             {
-                "exp": datetime.now(UTC) + timedelta(minutes=expire_minutes),
+                # iat 精確到毫秒，用來判斷 token 是否簽發於撤銷之前
+                "iat": round(now, 3),
+                "exp": int(now + codec.expire_minutes * 60),
                 "usage": usage,  # 加入 usage 資訊
             }
         )
-        return jwt.encode(to_encode_payload, secret)
+        return codec.sign(to_encode_payload)
 
     async def generate_token_pair(
         self, access_payload: dict[str, Any], refresh_payload: dict[str, Any]
@@ -46,20 +133,12 @@ class TokenService:
             access_token=access_token, refresh_token=refresh_token, token_type="bearer"
         )
 
-    async def decode_token(
-        self, token: str, *, usage: Literal["access", "refresh"]
-    ) -> dict[str, Any]:
-        secret: str = self.config[usage]["secret"]
-        try:
-            payload = jwt.decode(token, secret)
-            assert payload.get("usage") == usage  # 檢查 usage 資訊
-            return payload
-        except ExpiredSignatureError as err:
-            raise ExpiredToken_401 from err  # ! 前端要負責 redirect 到 /refresh
-        except JWTError as err:
-            raise InvalidToken_401 from err
-        except Exception as err:
-            raise InvalidToken_401 from err
+    async def decode_token(self, token: str, *, usage: TokenUsage) -> dict[str, Any]:
+        payload = self.codecs[usage].verify(token)
+        # 檢查 usage 資訊
+        if payload.get("usage") != usage:
+            raise InvalidToken_401
+        return payload
 
 
 @lru_cache
@@ -0,0 +1,63 @@
+from typing import Protocol
+
+from cache.ttl import TTLCache
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class MemoryCacheBackend:
+    """預設的 in-process 後端，每個 worker 各自持有一份。"""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.cache = TTLCache[str, bytes](maxsize, ttl)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.cache.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.cache.pop(key)
+
+
+class NullCacheBackend:
+    """不保存任何資料的後端，每次都是 miss (回應一律重新產生)。"""
+
+    async def get(self, key: str) -> bytes | None:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class RedisCacheBackend:
+    """多個 worker 共用的後端 (需要另外安裝 `redis` 套件)。
+
+    任何實作 `CacheBackend` 介面的物件都能替換它，例如測試時改用 `MemoryCacheBackend`。
+    """
+
+    def __init__(self, url: str) -> None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as err:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis 需要先安裝 redis 套件") from err
+        self.client = Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
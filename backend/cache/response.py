@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache.backend import CacheBackend, MemoryCacheBackend, NullCacheBackend, RedisCacheBackend
+from config import settings
+from database.events import defer_until_commit
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def items_namespace(user_id: int) -> str:
+    return f"items:{user_id}"
+
+
+def user_namespace(user_id: int) -> str:
+    return f"users:{user_id}"
+
+
+class ResponseCache:
+    """讀取端點的回應快取，支援 ETag / `If-None-Match`。
+
+    每個 namespace (例如某位使用者的所有商品) 都有一個隨機的版本號，
+    快取 key 會帶上版本號；失效時只要換掉版本號，舊的資料就再也不會被讀到，
+    不必逐一刪除 key，也不怕版本號本身被 LRU 踢掉 (踢掉只會造成 miss)。
+
+    失效時另外留下一個存活 `written_ttl` 秒的寫入標記，讀取分流 (database/replica.py)
+    看到標記就改走主庫，讓剛寫入的資料不會因為 replica 延遲而讀不到。
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, written_ttl: float = 0.0) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.written_ttl = written_ttl
+
+    async def namespace_version(self, namespace: str) -> str:
+        version = await self.backend.get(f"version:{namespace}")
+        if version is None:
+            version = uuid.uuid4().hex.encode()
+            await self.backend.set(f"version:{namespace}", version, self.ttl)
+        return version.decode()
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            await self.backend.delete(f"version:{namespace}")
+            if self.written_ttl > 0:
+                await self.backend.set(f"written:{namespace}", b"1", self.written_ttl)
+
+    async def recently_written(self, namespace: str) -> bool:
+        return await self.backend.get(f"written:{namespace}") is not None
+
+    async def respond(
+        self, request: Request, namespace: str, build: Callable[[], Awaitable[BaseModel]]
+    ) -> Response:
+        version = await self.namespace_version(namespace)
+        query = urlencode(sorted(request.query_params.multi_items()))
+        key = f"response:{namespace}:{version}:{request.url.path}?{query}"
+        body = await self.backend.get(key)
+        if body is None:
+            body = (await build()).model_dump_json().encode()
+            await self.backend.set(key, body, self.ttl)
+
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    _settings = settings.get_settings()
+    backend: CacheBackend
+    if _settings.response_cache_backend == "redis" and _settings.response_cache_url:
+        backend = RedisCacheBackend(_settings.response_cache_url)
+    elif _settings.web_workers > 1:
+        # 失效只會換掉處理寫入的那個 worker 的版本號，其他 worker 的記憶體快取會繼續回舊資料，
+        # 多 worker 時不使用記憶體快取 (ETag / 304 仍然有效，只是每次都重新產生回應)
+        logger.warning(
+            "Response cache disabled: the memory backend is per-worker, "
+            "set RESPONSE_CACHE_BACKEND=redis when WEB_WORKERS > 1"
+        )
+        backend = NullCacheBackend()
+    else:
+        backend = MemoryCacheBackend(
+            _settings.response_cache_maxsize, _settings.response_cache_ttl_seconds
+        )
+    return ResponseCache(
+        backend, _settings.response_cache_ttl_seconds, _settings.read_your_writes_seconds
+    )
+
+
+def invalidate_on_commit(session: AsyncSession, *namespaces: str) -> None:
+    async def invalidate() -> None:
+        await get_response_cache().invalidate(*namespaces)
+
+    defer_until_commit(session, invalidate)
@@ -20,6 +20,64 @@ class Settings:
     access_token_expire_minutes: float
     refresh_token_secret: str
     refresh_token_expire_minutes: float
+    # bcrypt 專用 worker pool 的 thread 數量
+    password_hash_workers: int = 4
+    # bcrypt 排隊中的工作上限，超過時直接回 503
+    password_hash_max_queue: int = 64
+    # 已驗證身分 (access token → 使用者) 的快取容量與存活秒數
+    identity_cache_maxsize: int = 10000
+    identity_cache_ttl_seconds: float = 30.0
+    # 批次 API 單次請求可處理的商品數上限
+    bulk_max_items: int = 1000
+    # 讀取端回應快取：memory (只在 web_workers = 1 時啟用，各 worker 無法互相失效)
+    # 或 redis (多 worker 共用)
+    response_cache_backend: str = "memory"
+    response_cache_url: str | None = None
+    response_cache_maxsize: int = 10000
+    response_cache_ttl_seconds: float = 60.0
+    # 回應資料來自自己的資料庫，開啟後視為可信資料，跳過 response model 的逐欄驗證
+    fast_json_responses: bool = False
+    # 已驗證 token 的快取容量 (每種 usage 各一份)
+    token_cache_maxsize: int = 10000
+    # 撤銷清單多久從資料庫同步一次 (秒)
+    revocation_refresh_seconds: float = 5.0
+    # 每個 worker 多久清一次過期的 refresh token 紀錄 (秒)，0 表示不清 (交給 CLI 排程)
+    refresh_token_purge_seconds: float = 3600.0
+    # 連線池模式：queue (直連 Postgres)、pgbouncer (經由 transaction 模式的 pgbouncer，
+    # 保留小型連線池)、null (不在程式內做連線池，每次都向 pgbouncer 取連線)
+    db_pool_mode: str = "queue"
+    # 所有 uvicorn worker 加總的連線上限，平均分給每個 worker
+    db_max_connections: int = 100
+    # 每個 worker 可超出連線池的連線數
+    db_max_overflow: int = 0
+    # 連線池沒有空閒連線時最多等幾秒
+    db_pool_timeout: float = 40.0
+    # 取出連線前先確認連線仍可用
+    db_pool_pre_ping: bool = True
+    # uvicorn worker 數量
+    web_workers: int = 5
+    # 唯讀查詢可分流的 replica 連線字串 (以逗號分隔)，沒設定時全部走主庫；
+    # web_workers > 1 時需要 redis 回應快取 (寫入標記要讓所有 worker 看得到)
+    database_replica_uris: tuple[str, ...] = ()
+    # 寫入後多少秒內，同一個 namespace 的讀取固定走主庫；複寫延遲接近此值的 replica 會暫停使用
+    read_your_writes_seconds: float = 5.0
+    # replica 連線失敗後暫停使用的秒數
+    replica_retry_seconds: float = 30.0
+    # 啟動時的 schema 初始化：lock (各 worker 以 advisory lock 輪流執行)
+    # 或 skip (已由 main.py / `python -m database.cli init` 先做好)
+    db_init_mode: str = "lock"
+    # worker 啟動 (import + lifespan) 的時間預算，超過時記錄警告
+    startup_budget_seconds: float = 1.0
+    # 多 worker 共用的 metrics 目錄，未設定時只回報目前 worker
+    metrics_dir: str | None = None
+    # 每個 worker 把 metrics 快照寫入 metrics_dir 的間隔
+    metrics_flush_seconds: float = 1.0
+    # 記錄每個請求的 SQL 數量與耗時 (Server-Timing header)、N+1 與慢查詢
+    sql_instrumentation: bool = False
+    # 超過此毫秒數的 SQL 記錄為慢查詢 (需開啟 sql_instrumentation)
+    slow_query_ms: float = 200.0
+    # 同一個請求中同一個 relationship lazy load 達此次數即視為 N+1
+    n_plus_one_threshold: int = 3
     app_name: str = "TestFastAPI"
     author: str = "RogelioKG"
 
@@ -34,6 +92,39 @@ class Settings:
             access_token_expire_minutes=float(try_getenv("ACCESS_TOKEN_EXPIRE_MINUTES")),
             refresh_token_secret=try_getenv("REFRESH_TOKEN_SECRET"),
             refresh_token_expire_minutes=float(try_getenv("REFRESH_TOKEN_EXPIRE_MINUTES")),
+            password_hash_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "4")),
+            password_hash_max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64")),
+            identity_cache_maxsize=int(os.getenv("IDENTITY_CACHE_MAXSIZE", "10000")),
+            identity_cache_ttl_seconds=float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "30")),
+            bulk_max_items=int(os.getenv("BULK_MAX_ITEMS", "1000")),
+            response_cache_backend=os.getenv("RESPONSE_CACHE_BACKEND", "memory"),
+            response_cache_url=os.getenv("RESPONSE_CACHE_URL"),
+            response_cache_maxsize=int(os.getenv("RESPONSE_CACHE_MAXSIZE", "10000")),
+            response_cache_ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60")),
+            fast_json_responses=os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true",
+            token_cache_maxsize=int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000")),
+            revocation_refresh_seconds=float(os.getenv("REVOCATION_REFRESH_SECONDS", "5")),
+            refresh_token_purge_seconds=float(os.getenv("REFRESH_TOKEN_PURGE_SECONDS", "3600")),
+            db_pool_mode=os.getenv("DB_POOL_MODE", "queue"),
+            db_max_connections=int(os.getenv("DB_MAX_CONNECTIONS", "100")),
+            db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "0")),
+            db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "40")),
+            db_pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+            web_workers=int(os.getenv("WEB_WORKERS", "5")),
+            database_replica_uris=tuple(
+                uri.strip()
+                for uri in os.getenv("DATABASE_REPLICA_URIS", "").split(",")
+                if uri.strip()
+            ),
+            read_your_writes_seconds=float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")),
+            replica_retry_seconds=float(os.getenv("REPLICA_RETRY_SECONDS", "30")),
+            db_init_mode=os.getenv("DB_INIT_MODE", "lock"),
+            startup_budget_seconds=float(os.getenv("STARTUP_BUDGET_SECONDS", "1")),
+            metrics_dir=os.getenv("METRICS_DIR"),
+            metrics_flush_seconds=float(os.getenv("METRICS_FLUSH_SECONDS", "1.0")),
+            sql_instrumentation=os.getenv("SQL_INSTRUMENTATION", "false").lower() == "true",
+            slow_query_ms=float(os.getenv("SLOW_QUERY_MS", "200.0")),
+            n_plus_one_threshold=int(os.getenv("N_PLUS_ONE_THRESHOLD", "3")),
         )
 
     def to_dict(self) -> dict:
@@ -1,11 +1,18 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from typing import NoReturn
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, Select, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from cache.response import invalidate_on_commit, items_namespace
 from exceptions.http import ItemNotFound_404, UnauthorizedAccess_403
 from models.item import Item
-from schemas.item import ItemCreate, ItemUpdate
+from models.user import User
+from schemas.item import ItemBulkUpdate, ItemCreate, ItemUpdate
+
+# ItemRead 需要的欄位；唯讀查詢只 select 這些欄位並回傳 Row，
+# 不建立 ORM 物件、不進 identity map，也不會載入 created_at / update_at 等用不到的欄位
+READ_COLUMNS = (Item.id, Item.name, Item.price, Item.brand, Item.description, Item.stock)
 
 
 class ItemCrud:
@@ -13,12 +20,26 @@ class ItemCrud:
         self.session = session
 
     async def create(self, data: ItemCreate, user_id: int) -> Item:
-        item = Item(user_id=user_id, **data.model_dump())
-        self.session.add(item)
-        await self.session.flush()
-        await self.session.refresh(item)
+        # INSERT ... RETURNING：一個 statement 就拿到含 id 與預設值的完整資料
+        result = await self.session.execute(
+            insert(Item).values(user_id=user_id, **data.model_dump()).returning(Item)
+        )
+        item = result.scalar_one()
+        await self.adjust_item_count(user_id, 1)
+        invalidate_on_commit(self.session, items_namespace(user_id))
         return item
 
+    async def create_many(self, data: Sequence[ItemCreate], user_id: int) -> Sequence[Item]:
+        # 多列 INSERT ... RETURNING (insertmanyvalues)，回傳順序與輸入一致
+        result = await self.session.scalars(
+            insert(Item).returning(Item, sort_by_parameter_order=True),
+            [{"user_id": user_id, **item.model_dump()} for item in data],
+        )
+        items = result.all()
+        await self.adjust_item_count(user_id, len(items))
+        invalidate_on_commit(self.session, items_namespace(user_id))
+        return items
+
     async def get_all(self) -> Sequence[Item]:
         result = await self.session.execute(select(Item))
         return result.scalars().all()
@@ -31,33 +52,184 @@ class ItemCrud:
             raise UnauthorizedAccess_403
         return item
 
-    async def get_all_by_user_id(self, user_id: int, limit: int, offset: int) -> Sequence[Item]:
+    async def get_row_by_id_and_validate(self, item_id: int, user_id: int) -> Row:
         result = await self.session.execute(
-            select(Item)
+            select(*READ_COLUMNS, Item.user_id).where(Item.id == item_id)
+        )
+        row = result.first()
+        if row is None:
+            raise ItemNotFound_404
+        elif row.user_id != user_id:
+            raise UnauthorizedAccess_403
+        return row
+
+    async def get_rows_by_user_id(self, user_id: int, limit: int, offset: int) -> Sequence[Row]:
+        result = await self.session.execute(
+            select(*READ_COLUMNS)
             .where(Item.user_id == user_id)
             .order_by(Item.id.desc())
             .limit(limit)
             .offset(offset)
         )
-        return result.scalars().all()
+        return result.all()
+
+    async def get_rows_by_user_id_after(
+        self, user_id: int, limit: int, after_id: int | None = None
+    ) -> Sequence[Row]:
+        # keyset pagination：以上一頁最後一筆的 id 為界，不論翻到第幾頁都只掃 limit 筆
+        stmt = select(*READ_COLUMNS).where(Item.user_id == user_id)
+        if after_id is not None:
+            stmt = stmt.where(Item.id < after_id)
+        result = await self.session.execute(stmt.order_by(Item.id.desc()).limit(limit))
+        return result.all()
 
     async def count_by_user_id(self, user_id: int) -> int:
+        # 讀維護中的計數器 (主鍵查詢)，不必每次 COUNT(*) 掃過使用者的所有商品
+        result = await self.session.execute(select(User.item_count).where(User.id == user_id))
+        return result.scalar_one_or_none() or 0
+
+    async def adjust_item_count(self, user_id: int, delta: int) -> None:
+        # 與商品的寫入在同一個交易中更新；UPDATE 會鎖住該使用者這一列，
+        # 同一個使用者的並行寫入因此依序套用。明確帶入 update_at，不觸發 onupdate
+        if delta:
+            await self.session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(item_count=User.item_count + delta, update_at=User.update_at)
+            )
+
+    async def update_partial(self, item_id: int, user_id: int, data: ItemUpdate) -> Item:
+        update_data = data.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_by_id_and_validate(item_id, user_id)
+        # UPDATE ... WHERE id AND user_id RETURNING：擁有權檢查與更新合併成一個 statement
         result = await self.session.execute(
-            select(func.count()).select_from(Item).where(Item.user_id == user_id)
+            update(Item)
+            .where(Item.id == item_id, Item.user_id == user_id)
+            .values(**update_data)
+            .returning(Item)
         )
-        return result.scalar_one()
+        item = result.scalar_one_or_none()
+        if item is None:
+            await self.raise_not_found_or_forbidden(item_id)
+        invalidate_on_commit(self.session, items_namespace(user_id))
+        return item
 
-    async def update_partial(self, item_id: int, data: ItemUpdate) -> Item:
-        item = await self.session.get(Item, item_id)
-        if not item:
+    async def delete(self, item_id: int, user_id: int) -> None:
+        result = await self.session.execute(
+            delete(Item).where(Item.id == item_id, Item.user_id == user_id).returning(Item.id)
+        )
+        if result.scalar_one_or_none() is None:
+            await self.raise_not_found_or_forbidden(item_id)
+        await self.adjust_item_count(user_id, -1)
+        invalidate_on_commit(self.session, items_namespace(user_id))
+
+    async def update_many(self, data: Sequence[ItemBulkUpdate], user_id: int) -> Sequence[Item]:
+        item_ids = [item.id for item in data]
+        await self.validate_ownership_many(item_ids, user_id)
+        # 以主鍵做 executemany 的 bulk UPDATE，沒有要更新的欄位就略過
+        rows = [item.model_dump(exclude_unset=True) | {"id": item.id} for item in data]
+        rows = [row for row in rows if len(row) > 1]
+        if rows:
+            await self.session.execute(update(Item), rows)
+            invalidate_on_commit(self.session, items_namespace(user_id))
+        result = await self.session.scalars(
+            select(Item)
+            .where(Item.id.in_(item_ids))
+            .order_by(Item.id.desc())
+            .execution_options(populate_existing=True)
+        )
+        return result.all()
+
+    async def delete_many(self, item_ids: Sequence[int], user_id: int) -> None:
+        unique_ids = set(item_ids)
+        result = await self.session.scalars(
+            delete(Item).where(Item.id.in_(unique_ids), Item.user_id == user_id).returning(Item.id)
+        )
+        deleted_ids = set(result.all())
+        deleted = len(deleted_ids)
+        # 有任何一筆沒刪到就找出原因並拋錯，整個交易會被 rollback
+        if deleted != len(unique_ids):
+            await self.raise_not_found_or_forbidden_many(unique_ids - deleted_ids)
+        # 通過檢查才調整計數器，被拒絕的批次不會動到 item_count
+        await self.adjust_item_count(user_id, -deleted)
+        invalidate_on_commit(self.session, items_namespace(user_id))
+
+    async def validate_ownership_many(self, item_ids: Iterable[int], user_id: int) -> None:
+        # 一個 set-based 查詢一次檢查所有商品的存在與擁有權
+        unique_ids = set(item_ids)
+        result = await self.session.execute(
+            select(Item.id, Item.user_id).where(Item.id.in_(unique_ids))
+        )
+        owners = dict(result.tuples().all())
+        if len(owners) != len(unique_ids):
             raise ItemNotFound_404
-        update_data = data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(item, key, value)
-        return item
+        if any(owner != user_id for owner in owners.values()):
+            raise UnauthorizedAccess_403
 
-    async def delete(self, item_id: int) -> None:
-        item = await self.session.get(Item, item_id)
-        if not item:
+    async def raise_not_found_or_forbidden_many(self, item_ids: set[int]) -> NoReturn:
+        # item_ids 是沒有刪到的商品：自己的商品已經在同一個交易中刪掉，只需查這些
+        result = await self.session.scalars(select(Item.id).where(Item.id.in_(item_ids)))
+        if len(result.all()) != len(item_ids):
             raise ItemNotFound_404
-        await self.session.delete(item)
+        raise UnauthorizedAccess_403
+
+    async def raise_not_found_or_forbidden(self, item_id: int) -> NoReturn:
+        # 只有在寫入沒有命中時才多查一次，用來區分 404 與 403
+        result = await self.session.execute(select(Item.id).where(Item.id == item_id))
+        if result.scalar_one_or_none() is None:
+            raise ItemNotFound_404
+        raise UnauthorizedAccess_403
+
+
+def count_items(user_ids: Iterable[int]) -> Select:
+    return (
+        select(Item.user_id, func.count().label("count"))
+        .where(Item.user_id.in_(user_ids))
+        .group_by(Item.user_id)
+    )
+
+
+async def reconcile_item_counts(
+    session_factory: async_sessionmaker[AsyncSession], batch_size: int = 1000
+) -> int:
+    """以實際的 COUNT(*) 修正 `User.item_count` 的偏差，回傳修正的使用者數。
+
+    依 id 分批掃描，每批各自一個交易；只有計數不一致的使用者會被鎖住並重新計算，
+    寫入商品的交易同樣要更新這一列，所以重新計算期間不會有新的變動被漏算。
+    """
+    repaired = 0
+    after_id = 0
+    while True:
+        async with session_factory.begin() as session:
+            user_ids = (
+                await session.scalars(
+                    select(User.id).where(User.id > after_id).order_by(User.id).limit(batch_size)
+                )
+            ).all()
+            if not user_ids:
+                return repaired
+            after_id = user_ids[-1]
+
+            actual = count_items(user_ids).subquery()
+            drifted = (
+                await session.scalars(
+                    select(User.id)
+                    .outerjoin(actual, actual.c.user_id == User.id)
+                    .where(
+                        User.id.in_(user_ids),
+                        User.item_count != func.coalesce(actual.c.count, 0),
+                    )
+                    .with_for_update(of=User)
+                )
+            ).all()
+            if not drifted:
+                continue
+            counts = dict((await session.execute(count_items(drifted))).tuples().all())
+            for user_id in drifted:
+                await session.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(item_count=counts.get(user_id, 0), update_at=User.update_at)
+                )
+            repaired += len(drifted)
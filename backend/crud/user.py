@@ -1,14 +1,20 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 
 from pydantic import SecretStr
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.password import hash_password
+from auth.identity import invalidate_identity
+from auth.password import hash_password_async
+from auth.revocation import revoke_tokens
+from cache.response import invalidate_on_commit, items_namespace, user_namespace
 from exceptions.http import UserNotFound_404
 from models.user import User
 from schemas.user import UserCreate, UserUpdate
 
+# UserRead 需要的欄位 (不含 password)，唯讀查詢只取這些欄位並回傳 Row
+READ_COLUMNS = (User.id, User.name, User.email, User.avatar, User.age, User.birthday)
+
 
 class UserCrud:
     def __init__(self, session: AsyncSession) -> None:
@@ -16,22 +22,50 @@ class UserCrud:
 
     async def create(self, data: UserCreate) -> User:
         user = User(**data.model_dump())
-        user.password = hash_password(data.password)
+        user.password = await hash_password_async(data.password)
         self.session.add(user)
         await self.session.flush()
         await self.session.refresh(user)
+        # 新使用者還沒有快取，這裡只是讓接下來的讀取在 replica 追上之前先走主庫
+        invalidate_on_commit(self.session, user_namespace(user.id))
         return user
 
     async def get_all(self) -> Sequence[User]:
         result = await self.session.execute(select(User))
         return result.scalars().all()
 
+    async def get_page(self, limit: int, after_id: int | None = None) -> Sequence[Row]:
+        stmt = select(*READ_COLUMNS)
+        if after_id is not None:
+            stmt = stmt.where(User.id > after_id)
+        result = await self.session.execute(stmt.order_by(User.id).limit(limit))
+        return result.all()
+
+    async def stream_all(self, batch_size: int = 500) -> AsyncIterator[Sequence[Row]]:
+        """以 server-side cursor 分批取出所有使用者 (只取 UserRead 需要的欄位)。
+
+        回傳的是 Row 而不是 ORM 物件，不會累積在 session 的 identity map 裡，
+        所以記憶體用量只跟 batch_size 有關，跟資料表大小無關。
+        """
+        result = await self.session.stream(
+            select(*READ_COLUMNS).order_by(User.id).execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+
     async def get_by_id(self, user_id: int) -> User:
         user = await self.session.get(User, user_id)
         if not user:
             raise UserNotFound_404
         return user
 
+    async def get_row_by_id(self, user_id: int) -> Row:
+        result = await self.session.execute(select(*READ_COLUMNS).where(User.id == user_id))
+        row = result.first()
+        if row is None:
+            raise UserNotFound_404
+        return row
+
     async def get_by_email(self, email: str) -> User:
         result = await self.session.execute(select(User).where(User.email == email))
         user = result.scalars().first()
@@ -44,13 +78,20 @@ class UserCrud:
         update_data = data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(user, key, value)
+        invalidate_identity(self.session, user_id)
+        invalidate_on_commit(self.session, user_namespace(user_id))
         return user
 
     async def update_password(self, user_id: int, password: SecretStr) -> User:
         user = await self.get_by_id(user_id)
-        user.password = hash_password(password)
+        user.password = await hash_password_async(password)
+        invalidate_identity(self.session, user_id)
+        await revoke_tokens(self.session, user_id)
         return user
 
     async def delete(self, user_id: int) -> None:
         user = await self.get_by_id(user_id)
         await self.session.delete(user)
+        invalidate_identity(self.session, user_id)
+        await revoke_tokens(self.session, user_id)
+        invalidate_on_commit(self.session, user_namespace(user_id), items_namespace(user_id))
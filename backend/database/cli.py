@@ -0,0 +1,81 @@
+"""資料庫維運指令，部署時在啟動 worker 之前執行一次：
+
+    cd backend && python -m database.cli init
+    cd backend && python -m database.cli version
+    cd backend && python -m database.cli purge-refresh-tokens
+    cd backend && python -m database.cli reconcile-item-counts
+
+搭配 `DB_INIT_MODE=skip`，各 worker 啟動時就不會再碰 schema。
+"""
+
+import argparse
+import asyncio
+
+from config.settings import try_getenv
+from main import load_environment
+
+
+async def init() -> None:
+    from database.session import close_db, init_db
+
+    try:
+        applied = await init_db()
+    finally:
+        await close_db()
+    print(f"schema ready, applied migrations: {applied or 'none'}")
+
+
+async def version() -> None:
+    from database.migrations import get_current_version
+    from database.session import close_db, engine
+
+    try:
+        print(await get_current_version(engine))
+    finally:
+        await close_db()
+
+
+async def purge_refresh_tokens() -> None:
+    from auth.refresh import purge_expired_refresh_tokens
+    from database.session import AsyncSessionLocal, close_db
+
+    try:
+        async with AsyncSessionLocal.begin() as session:
+            purged = await purge_expired_refresh_tokens(session)
+    finally:
+        await close_db()
+    print(f"purged {purged} expired refresh tokens")
+
+
+async def reconcile_item_counts() -> None:
+    from crud.item import reconcile_item_counts
+    from database.session import AsyncSessionLocal, close_db
+
+    try:
+        repaired = await reconcile_item_counts(AsyncSessionLocal)
+    finally:
+        await close_db()
+    print(f"repaired item_count of {repaired} users")
+
+
+COMMANDS = {
+    "init": init,
+    "version": version,
+    "purge-refresh-tokens": purge_refresh_tokens,
+    "reconcile-item-counts": reconcile_item_counts,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m database.cli")
+    parser.add_argument("command", choices=COMMANDS)
+    args = parser.parse_args()
+
+    # 與 main.py 相同的 .env 載入順序；Settings 在載入之後才能讀，所以上面都延後 import
+    load_environment("MAIN")
+    load_environment(try_getenv("APP_MODE"))
+    asyncio.run(COMMANDS[args.command]())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """在 session 下一次 commit 成功後執行 callback (只執行一次)。"""
+
+    def listener(_session) -> None:
+        callback()
+
+    event.listen(session.sync_session, "after_commit", listener, once=True)
+
+
+def defer_until_commit(session: AsyncSession, task: Callable[[], Awaitable[None]]) -> None:
+    """登記一個在交易 commit 後才執行的非同步工作，由 `get_session` 負責執行。"""
+    session.info.setdefault("deferred_tasks", []).append(task)
+
+
+async def run_deferred_tasks(session: AsyncSession) -> None:
+    for task in session.info.pop("deferred_tasks", []):
+        await task()
@@ -0,0 +1,168 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# 版本表獨立於 Base.metadata，不會被 create_all / drop_all 影響
+metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200)),
+    Column("applied_at", DateTime, default=datetime.now),
+)
+
+
+# 多個 worker 同時啟動時讓 migration 依序執行的 advisory lock key (任意固定值)
+MIGRATION_LOCK_KEY = 7_204_052
+# 沒拿到 advisory lock 時，隔多久再試一次 (秒)
+LOCK_POLL_SECONDS = 0.1
+
+
+@asynccontextmanager
+async def advisory_lock(
+    engine: AsyncEngine, key: int, poll_seconds: float = LOCK_POLL_SECONDS
+) -> AsyncIterator[None]:
+    """讓多個 process 依序執行同一段 schema 變更 (只有 Postgres 需要)。
+
+    以 `pg_try_advisory_xact_lock` 輪詢：沒拿到鎖就結束交易、sleep 之後再試，
+    等待中的 process 不會留著執行中的查詢。若改用會阻塞的 `pg_advisory_xact_lock`，
+    持鎖者跑 `CREATE INDEX CONCURRENTLY` 時要等這些查詢的 snapshot 結束，它們卻在等持鎖者，
+    這個循環經過 client 端，Postgres 偵測不到，啟動就會卡住。
+    拿到鎖後交易保持開啟直到離開 (READ COMMITTED 在語句之間不持有 snapshot，不會擋到 CIC)；
+    交易層級的鎖在 transaction 模式的 pgbouncer 後面也能正確持有。
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    async with engine.connect() as conn:
+        lock = text("SELECT pg_try_advisory_xact_lock(:key)")
+        while not await conn.scalar(lock, {"key": key}):
+            await conn.rollback()
+            await asyncio.sleep(poll_seconds)
+        # 離開 connect() 時 rollback，鎖隨交易一起釋放
+        yield
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+def create_index(
+    name: str, table: str, columns: str
+) -> Callable[[AsyncConnection], Awaitable[None]]:
+    """建立索引的 migration 步驟。
+
+    在 Postgres 上使用 `CREATE INDEX CONCURRENTLY`，建索引期間不會鎖住寫入；
+    若先前 CONCURRENTLY 建到一半失敗，會留下 INVALID 的索引，這裡會先把它清掉再重建。
+    其他資料庫 (例如測試用的 SQLite) 則直接 `CREATE INDEX IF NOT EXISTS`。
+    """
+
+    async def upgrade(conn: AsyncConnection) -> None:
+        if conn.dialect.name != "postgresql":
+            await conn.execute(
+                text(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns})')
+            )
+            return
+        invalid = await conn.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        )
+        if invalid.first() is not None:
+            await conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        await conn.execute(
+            text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ({columns})')
+        )
+
+    return upgrade
+
+
+async def add_item_count(conn: AsyncConnection) -> None:
+    """替既有的 User 表加上 `item_count` 並以實際商品數回填 (新建的資料庫已由 create_all 建好)。"""
+    columns = await conn.run_sync(
+        lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("User")}
+    )
+    if "item_count" not in columns:
+        await conn.execute(
+            text('ALTER TABLE "User" ADD COLUMN item_count INTEGER NOT NULL DEFAULT 0')
+        )
+    await conn.execute(
+        text(
+            'UPDATE "User" SET item_count = '
+            '(SELECT COUNT(*) FROM "Item" WHERE "Item".user_id = "User".id)'
+        )
+    )
+
+
+# 依版本號遞增排列，已發佈的 migration 不要再修改，新的變更請往後加
+MIGRATIONS: list[Migration] = [
+    Migration(
+        version=1,
+        description="Item(user_id, id DESC) 複合索引",
+        upgrade=create_index("ix_Item_user_id_id", "Item", "user_id, id DESC"),
+    ),
+    Migration(
+        version=2,
+        description="User.item_count 商品數計數器",
+        upgrade=add_item_count,
+    ),
+]
+
+
+async def get_current_version(engine: AsyncEngine) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        result = await conn.execute(
+            select(schema_version.c.version).order_by(schema_version.c.version.desc()).limit(1)
+        )
+        return result.scalar_one_or_none() or 0
+
+
+async def migrate(engine: AsyncEngine) -> list[int]:
+    """依序套用尚未執行的 migration，回傳這次套用的版本號。
+
+    每個 migration 都在 autocommit 連線上執行 (CONCURRENTLY 不能在交易中跑)，
+    成功後才寫入版本表，因此中途失敗重跑時會從失敗的那個版本繼續。
+    多個 worker 同時呼叫時以 advisory lock 依序執行，後面的 worker 拿到鎖才讀版本號，
+    只會看到已經套用完成的版本而直接略過。
+    """
+
+    async with advisory_lock(engine, MIGRATION_LOCK_KEY):
+        current = await get_current_version(engine)
+        applied: list[int] = []
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            async with engine.connect() as conn:
+                autocommit_conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await migration.upgrade(autocommit_conn)
+                await autocommit_conn.execute(
+                    insert(schema_version).values(
+                        version=migration.version, description=migration.description
+                    )
+                )
+            applied.append(migration.version)
+        return applied
@@ -0,0 +1,153 @@
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, PoolProxiedConnection, QueuePool
+
+from config.settings import Settings
+from metrics.registry import REGISTRY, Counter, Histogram, Labels
+
+POOL_MODES = ("queue", "pgbouncer", "null")
+# pgbouncer 模式下每個 worker 平時保留的連線數；pgbouncer 本身已經做連線池，
+# 這裡只留幾條省下重新連線的成本，尖峰時的其餘連線用完就關掉
+PGBOUNCER_POOL_SIZE = 2
+
+DB_POOL_CHECKOUT_SECONDS = REGISTRY.register(
+    Histogram(
+        "db_pool_checkout_seconds",
+        "Time spent waiting for a connection from the pool (including connecting)",
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+    )
+)
+DB_POOL_EVENTS = REGISTRY.register(
+    Counter("db_pool_events_total", "Connection pool events", ("event",))
+)
+
+
+class TimedPoolMixin:
+    """記錄每次從連線池取連線花了多久 (滿了要排隊、NullPool 要重新連線)。"""
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return super().connect()  # type: ignore[misc]
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(TimedPoolMixin, NullPool):
+    pass
+
+
+def pool_size_per_worker(_settings: Settings) -> int:
+    # 每個 worker 都有自己的連線池，總連線數 = 連線池大小 × worker 數
+    return max(1, _settings.db_max_connections // max(1, _settings.web_workers))
+
+
+def prepared_statement_name() -> str:
+    # pgbouncer transaction 模式下同一條後端連線會輪流給不同 client，
+    # 預設的流水號名稱會撞名，改用不會重複的名稱
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def engine_options(_settings: Settings) -> dict[str, Any]:
+    """依 `db_pool_mode` 產生 `create_async_engine` 的連線池參數。"""
+    mode = _settings.db_pool_mode
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown DB_POOL_MODE {mode!r}, expected one of {POOL_MODES}.")
+
+    url = make_url(_settings.database_uri)
+    options: dict[str, Any] = {"pool_pre_ping": _settings.db_pool_pre_ping}
+    if mode == "null":
+        # 連線池交給 pgbouncer，避免兩層連線池各自佔住連線
+        options["poolclass"] = TimedNullPool
+    elif url.get_backend_name() != "sqlite":
+        # SQLite (測試用) 由 SQLAlchemy 自行挑選連線池，不接受這些參數
+        pool_size = pool_size_per_worker(_settings)
+        max_overflow = _settings.db_max_overflow
+        if mode == "pgbouncer":
+            # 上限不變，但平時只保留小型連線池，其餘改成 overflow (歸還時關閉)
+            max_overflow += max(0, pool_size - PGBOUNCER_POOL_SIZE)
+            pool_size = min(pool_size, PGBOUNCER_POOL_SIZE)
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=_settings.db_pool_timeout,
+            # 當一條 connection 存在超過幾秒時，主動關掉並分配一條新連線
+            pool_recycle=1800,
+        )
+
+    if mode != "queue" and url.get_driver_name() == "asyncpg":
+        # transaction 模式的 pgbouncer 不保證下一個語句落在同一條後端連線，
+        # 關掉 asyncpg 與 SQLAlchemy 兩層 prepared statement 快取
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": prepared_statement_name,
+        }
+    return options
+
+
+class PoolMonitor:
+    """透過連線池事件累計連線數據，給健康檢查使用。"""
+
+    def __init__(self, engine: AsyncEngine, mode: str) -> None:
+        self.engine = engine
+        self.mode = mode
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "connect", self.on_connect)
+        event.listen(sync_engine, "checkout", self.on_checkout)
+        event.listen(sync_engine, "invalidate", self.on_invalidate)
+
+    def on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+        DB_POOL_EVENTS.inc("connect")
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+        DB_POOL_EVENTS.inc("checkout")
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        # pre-ping 失敗或連線中斷時觸發
+        self.invalidations += 1
+        DB_POOL_EVENTS.inc("invalidate")
+
+    def usage(self) -> dict[Labels, float]:
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return {}
+        return {
+            ("checked_out",): pool.checkedout(),
+            ("checked_in",): pool.checkedin(),
+            ("overflow",): max(0, pool.overflow()),
+            ("size",): pool.size(),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        stats: dict[str, Any] = {
+            "mode": self.mode,
+            "pool": type(pool).__name__,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "invalidations": self.invalidations,
+        }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return stats
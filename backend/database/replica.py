@@ -0,0 +1,112 @@
+import itertools
+import time
+from collections.abc import Awaitable, Callable, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 每隔幾秒檢查一次 replica 的複寫延遲
+LAG_CHECK_SECONDS = 1.0
+# standby 落後主庫的秒數；WAL 都已套用時為 0 (主庫閒置時 replay 時間戳記會停住，不能直接相減)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaRouter:
+    """決定唯讀查詢要送到哪個資料庫。
+
+    - 沒有設定 replica、或所有 replica 都不健康時，一律走主庫
+    - namespace 最近有寫入 (見 `ResponseCache.recently_written`) 時走主庫，
+      確保使用者寫入後馬上讀得到 (read-your-writes)，也避免把 replica 上的舊資料放進回應快取
+    - 其餘情況輪流使用健康的 replica；連線失敗的 replica 會暫停使用 `retry_seconds` 秒
+    - 有設定 `max_lag_seconds` 時，複寫延遲超過它的 replica 暫停使用到下一次檢查；
+      寫入標記過期之後讀到的 replica 一定已經有那筆寫入，也不會把寫入前的資料放進新的快取 key
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine],
+        recently_written: Callable[[str], Awaitable[bool]],
+        retry_seconds: float,
+        max_lag_seconds: float | None = None,
+    ) -> None:
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.recently_written = recently_written
+        self.retry_seconds = retry_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_checked_at = float("-inf")
+        self.unhealthy_until: dict[AsyncEngine, float] = {}
+        self.counter = itertools.count()
+        for replica in self.replicas:
+            event.listen(replica.sync_engine, "handle_error", self.error_listener(replica))
+
+    def error_listener(self, replica: AsyncEngine) -> Callable[[ExceptionContext], None]:
+        def listener(context: ExceptionContext) -> None:
+            # 查詢途中斷線也算不健康，之後的請求先改走其他資料庫
+            if context.is_disconnect:
+                self.mark_unhealthy(replica)
+
+        return listener
+
+    def mark_unhealthy(self, replica: AsyncEngine) -> None:
+        self.unhealthy_until[replica] = time.monotonic() + self.retry_seconds
+
+    def healthy_replicas(self) -> list[AsyncEngine]:
+        now = time.monotonic()
+        return [
+            replica
+            for replica in self.replicas
+            if self.unhealthy_until.get(replica, float("-inf")) <= now
+        ]
+
+    async def replica_lag(self, replica: AsyncEngine) -> float | None:
+        """replica 落後主庫的秒數，無法判斷 (非 Postgres) 時回傳 None。"""
+        if replica.dialect.name != "postgresql":
+            return None
+        async with replica.connect() as conn:
+            lag = await conn.scalar(REPLICA_LAG_SQL)
+        return None if lag is None else float(lag)
+
+    async def check_lag(self) -> None:
+        now = time.monotonic()
+        if self.max_lag_seconds is None or now - self.lag_checked_at < LAG_CHECK_SECONDS:
+            return
+        self.lag_checked_at = now
+        for replica in self.healthy_replicas():
+            try:
+                lag = await self.replica_lag(replica)
+            except (DBAPIError, OSError):
+                self.mark_unhealthy(replica)
+                continue
+            if lag is not None and lag > self.max_lag_seconds:
+                self.unhealthy_until[replica] = now + LAG_CHECK_SECONDS
+
+    async def choose(self, namespace: str | None = None) -> AsyncEngine:
+        if not self.replicas:
+            return self.primary
+        if namespace is not None and await self.recently_written(namespace):
+            return self.primary
+        await self.check_lag()
+        replicas = self.healthy_replicas()
+        if not replicas:
+            return self.primary
+        return replicas[next(self.counter) % len(replicas)]
+
+    async def choose_reachable(self, namespace: str | None = None) -> AsyncEngine:
+        """同 `choose`，但會先確認 replica 連得上，連不上就改用主庫。"""
+        bind = await self.choose(namespace)
+        if bind is self.primary:
+            return bind
+        try:
+            async with bind.connect():
+                pass
+        except (DBAPIError, OSError):
+            self.mark_unhealthy(bind)
+            return self.primary
+        return bind
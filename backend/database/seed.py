@@ -0,0 +1,218 @@
+"""大量測試資料的產生工具，同樣的參數與 `--seed` 每次都產生相同的資料：
+
+    cd backend && python -m database.seed --users 10000 --items 1000000
+    cd backend && python -m database.seed --users 1000 --items 5000000 --skew 1.2 --replace
+
+帳號為 `{prefix}-{n}@example.com`，密碼都是 `--password` (預設與 performance/locustfile.py 相同)，
+可直接當成 locust 的 `--user-pool`。所有帳號共用同一個事先算好的 bcrypt hash，
+不必每個使用者各算一次；商品數依 Zipf 分布分給使用者 (`--skew 0` 為平均分配，
+越大越集中在前面幾個使用者)，用來重現少數大戶拖慢分頁、COUNT 的情況。
+
+Postgres (asyncpg) 以 COPY 匯入，其他資料庫以分批的 executemany INSERT 寫入。
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections.abc import Iterator, Sequence
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from config.settings import try_getenv
+from main import load_environment
+from models.item import Item
+from models.user import User
+
+# 產生的時間戳記從這裡開始往後排，不受執行當下的時間影響
+EPOCH = datetime(2024, 1, 1)
+USER_COLUMNS = (
+    "password",
+    "name",
+    "age",
+    "birthday",
+    "email",
+    "item_count",
+    "created_at",
+    "update_at",
+)
+ITEM_COLUMNS = (
+    "name",
+    "price",
+    "brand",
+    "description",
+    "stock",
+    "created_at",
+    "update_at",
+    "user_id",
+)
+BRANDS = ("ASUS", "Acer", "Apple", "Dell", "HP", "Lenovo", "MSI", "Samsung", "Sony", "Xiaomi")
+PRODUCTS = ("laptop", "monitor", "keyboard", "mouse", "phone", "tablet", "camera", "speaker")
+
+
+def seed_email(prefix: str, index: int) -> str:
+    return f"{prefix}-{index}@example.com"
+
+
+def distribute(total: int, users: int, skew: float) -> list[int]:
+    """依 Zipf 權重 1 / (rank + 1) ** skew 把 total 件商品分給 users 個使用者 (排名越前越多)。"""
+    weights = [1 / (rank + 1) ** skew for rank in range(users)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # 無條件捨去的餘數依序補給排名最前面的使用者
+    for rank in range(total - sum(counts)):
+        counts[rank % users] += 1
+    return counts
+
+
+def user_rows(
+    prefix: str, counts: Sequence[int], password_hash: str, rng: random.Random
+) -> Iterator[tuple]:
+    for index, item_count in enumerate(counts):
+        created = EPOCH + timedelta(seconds=index)
+        yield (
+            password_hash,
+            f"{prefix}-{index}"[:30],
+            rng.randint(18, 80),
+            date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 55)),
+            seed_email(prefix, index),
+            item_count,
+            created,
+            created,
+        )
+
+
+def item_rows(
+    user_ids: Sequence[int], counts: Sequence[int], rng: random.Random
+) -> Iterator[tuple]:
+    serial = 0
+    for user_id, count in zip(user_ids, counts, strict=True):
+        for _ in range(count):
+            created = EPOCH + timedelta(seconds=serial)
+            serial += 1
+            brand = rng.choice(BRANDS)
+            yield (
+                f"{brand} {rng.choice(PRODUCTS)} {serial}",
+                round(rng.uniform(10, 100000), 2),
+                brand,
+                None if rng.random() < 0.2 else f"seeded item {serial}",
+                rng.randint(0, 500),
+                created,
+                created,
+                user_id,
+            )
+
+
+def batched(rows: Iterator[tuple], size: int) -> Iterator[list[tuple]]:
+    batch: list[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def write_rows(
+    conn: AsyncConnection, table: Any, columns: Sequence[str], rows: list[tuple]
+) -> None:
+    if conn.dialect.driver == "asyncpg":
+        # COPY 比 INSERT 少了 SQL 解析與逐列的 bind 參數處理
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name, records=rows, columns=list(columns)
+        )
+        return
+    await conn.execute(insert(table), [dict(zip(columns, row, strict=True)) for row in rows])
+
+
+async def clear_seeded(conn: AsyncConnection, prefix: str) -> None:
+    seeded = select(User.id).where(User.email.like(f"{prefix}-%@example.com"))
+    await conn.execute(delete(Item).where(Item.user_id.in_(seeded)))
+    await conn.execute(delete(User).where(User.email.like(f"{prefix}-%@example.com")))
+
+
+async def seed(
+    engine: AsyncEngine,
+    *,
+    users: int,
+    items: int,
+    skew: float = 1.0,
+    seed: int = 0,
+    prefix: str = "load",
+    password_hash: str,
+    batch_size: int = 10000,
+    replace: bool = False,
+) -> dict[str, int]:
+    """寫入 users 個使用者與 items 件商品，回傳各使用者分到的商品數統計。"""
+    rng = random.Random(seed)
+    counts = distribute(items, users, skew)
+    async with engine.begin() as conn:
+        if replace:
+            await clear_seeded(conn, prefix)
+        for rows in batched(user_rows(prefix, counts, password_hash, rng), batch_size):
+            await write_rows(conn, User.__table__, USER_COLUMNS, rows)
+
+        # 依 email 取回自動編號的 id，順序對應 distribute 的排名
+        result = await conn.execute(
+            select(User.email, User.id).where(User.email.like(f"{prefix}-%@example.com"))
+        )
+        ids = dict(result.all())
+        user_ids = [ids[seed_email(prefix, index)] for index in range(users)]
+        for rows in batched(item_rows(user_ids, counts, rng), batch_size):
+            await write_rows(conn, Item.__table__, ITEM_COLUMNS, rows)
+    return {"users": users, "items": items, "max_items": max(counts), "min_items": min(counts)}
+
+
+async def run(args: argparse.Namespace) -> None:
+    from auth.password import hash_password
+    from database.session import close_db, engine, init_db
+
+    try:
+        await init_db()
+        started = time.perf_counter()
+        stats = await seed(
+            engine,
+            users=args.users,
+            items=args.items,
+            skew=args.skew,
+            seed=args.seed,
+            prefix=args.prefix,
+            password_hash=args.password_hash or hash_password(args.password),
+            batch_size=args.batch_size,
+            replace=args.replace,
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        await close_db()
+    rows = stats["users"] + stats["items"]
+    print(f"seeded {stats} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m database.seed")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf 指數，0 為平均分配")
+    parser.add_argument("--seed", type=int, default=0, help="亂數種子")
+    parser.add_argument("--prefix", default="load", help="帳號 email 前綴")
+    parser.add_argument("--password", default="securePass123")
+    parser.add_argument("--password-hash", help="直接使用這個 bcrypt hash，不再計算")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--replace", action="store_true", help="先刪除同前綴的帳號與其商品")
+    args = parser.parse_args()
+    if args.users <= 0 or args.items < 0:
+        parser.error("--users must be positive and --items non-negative")
+
+    # 與 database/cli.py 相同：先載入 .env，再 import 會讀 Settings 的模組
+    load_environment("MAIN")
+    load_environment(try_getenv("APP_MODE"))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,133 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import Any
 
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from cache.backend import MemoryCacheBackend, NullCacheBackend
+from cache.response import get_response_cache
 from config import settings
+from database.migrations import advisory_lock, migrate
+from database.pool import PoolMonitor, engine_options
+from database.replica import LAG_CHECK_SECONDS, ReplicaRouter
+from metrics.registry import REGISTRY, Gauge
+from metrics.sql import instrument_engine
+
+# create_all 只會建立已經 import 的 model，這裡全部載入，單獨執行 CLI 時也能建好所有資料表
+from models import item, refresh_token, revocation, user  # noqa: F401
 from models.base import Base
 
-engine = create_async_engine(
-    settings.get_settings().database_uri,
-    # connection pool 的 connection 數量 (預設 5)
-    pool_size=50,
-    # 容許多出的 connection 數量 (預設 10)
-    max_overflow=50,
-    # 當 connection pool 沒有 connection 時，願意等多久來拿 connection (預設 30)
-    pool_timeout=40,
-    # 當一條 connection 存在超過幾秒時，主動關掉並分配一條新連線 (預設 -1)
-    pool_recycle=1800,
+_settings = settings.get_settings()
+
+# 連線池大小、pgbouncer 相容設定見 database/pool.py
+engine = create_async_engine(_settings.database_uri, **engine_options(_settings))
+
+pool_monitor = PoolMonitor(engine, _settings.db_pool_mode)
+REGISTRY.register(
+    Gauge(
+        "db_pool_connections",
+        "Connections in the primary pool by state",
+        ("state",),
+        collect=pool_monitor.usage,
+    )
 )
 
+# 唯讀查詢用的 replica，分流規則見 database/replica.py
+replica_engines = [
+    create_async_engine(uri, **engine_options(_settings)) for uri in _settings.database_replica_uris
+]
+
+if _settings.sql_instrumentation:
+    # 每個請求的 SQL 數量 / 耗時、慢查詢 log，見 metrics/sql.py
+    for _engine in (engine, *replica_engines):
+        instrument_engine(_engine, _settings.slow_query_ms / 1000)
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     expire_on_commit=False,
 )
 
 
-async def init_db() -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+@lru_cache
+def autocommit_engine(bind: AsyncEngine) -> AsyncEngine:
+    # 共用同一個連線池，只是取出的連線改用 AUTOCOMMIT，不會送出 BEGIN / COMMIT
+    return bind.execution_options(isolation_level="AUTOCOMMIT")
+
+
+class ReadOnlySession(AsyncSession):
+    """唯讀請求用的 session。
+
+    以 AUTOCOMMIT 執行，而且每個查詢結束 (結果已經整批讀進記憶體) 就把連線還給連線池，
+    之後驗證 token、序列化回應等工作都不會佔著連線；下一個查詢才會再取一條。
+    綁定的 replica 連線失敗時會標記為不健康，改用主庫重試一次。
+    """
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return await self.run_and_release(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        return await self.run_and_release(super().scalar, *args, **kwargs)
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        return await self.run_and_release(super().get, *args, **kwargs)
+
+    async def run_and_release(
+        self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        try:
+            return await method(*args, **kwargs)
+        except (OperationalError, OSError):
+            replica = self.info.pop("replica", None)
+            if replica is None:
+                raise
+            get_replica_router().mark_unhealthy(replica)
+            await self.close()
+            self.use_bind(get_replica_router().primary)
+            return await method(*args, **kwargs)
+        finally:
+            # close 只會歸還連線並清空 identity map，已經讀出來的資料仍可使用
+            await self.close()
+
+    def use_bind(self, bind: AsyncEngine) -> None:
+        self.bind = autocommit_engine(bind)
+        self.sync_session.bind = self.bind.sync_engine
+
+
+ReadOnlySessionLocal = async_sessionmaker(
+    class_=ReadOnlySession,
+    expire_on_commit=False,
+)
+
+
+def open_read_session(bind: AsyncEngine) -> ReadOnlySession:
+    session = ReadOnlySessionLocal(bind=autocommit_engine(bind))
+    if bind is not engine:
+        session.info["replica"] = bind
+    return session
+
+
+# schema 初始化用的 advisory lock key (任意固定值)
+SCHEMA_LOCK_KEY = 7_204_051
+
+
+async def init_db() -> list[int]:
+    """建立資料表並套用 migration，回傳這次套用的 migration 版本號。
+
+    多個 worker 同時啟動時，create_all 與 migration 各自以 advisory lock 依序執行
+    (見 `database.migrations.advisory_lock`)；建表的鎖在 migration 之前就釋放，
+    `CREATE INDEX CONCURRENTLY` 執行時不會有其他 worker 卡在等鎖的查詢裡。
+    """
+    async with advisory_lock(engine, SCHEMA_LOCK_KEY):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    # 既有資料表的索引等結構變更交給 migration 補上
+    return await migrate(engine)
 
 
 async def drop_db():
@@ -31,5 +135,30 @@ async def drop_db():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@lru_cache
+def get_replica_router() -> ReplicaRouter:
+    response_cache = get_response_cache()
+    if (
+        replica_engines
+        and _settings.web_workers > 1
+        and isinstance(response_cache.backend, MemoryCacheBackend | NullCacheBackend)
+    ):
+        # 寫入標記只存在處理寫入的 worker，同一個使用者下一個請求落到其他 worker 就會讀到舊資料
+        raise ValueError(
+            "DATABASE_REPLICA_URIS with WEB_WORKERS > 1 requires a shared response cache "
+            "(RESPONSE_CACHE_BACKEND=redis) for read-your-writes."
+        )
+    return ReplicaRouter(
+        engine,
+        replica_engines,
+        response_cache.recently_written,
+        _settings.replica_retry_seconds,
+        # 延遲檢查之間 replica 最多再落後 LAG_CHECK_SECONDS，門檻要扣掉這段
+        max_lag_seconds=max(0.0, _settings.read_your_writes_seconds - LAG_CHECK_SECONDS),
+    )
+
+
 async def close_db() -> None:
     await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
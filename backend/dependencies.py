@@ -1,22 +1,53 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Annotated, Any, Literal
 
 from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from auth.identity import cache_identity, get_identity_cache, identity_version
+from auth.revocation import ensure_not_revoked
 from auth.token import TokenService, get_token_service
+from cache.response import ResponseCache, get_response_cache, items_namespace, user_namespace
 from crud.item import ItemCrud
 from crud.user import UserCrud
-from database.session import AsyncSessionLocal
+from database.events import run_deferred_tasks
+from database.session import AsyncSessionLocal, engine, get_replica_router, open_read_session
 from exceptions.http import InvalidToken_401, UnauthorizedAccess_403
-from models.user import User
 from schemas.auth import OAuth2Token
+from schemas.user import UserRead
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, Any]:
     async with AsyncSessionLocal() as session:
         async with session.begin():
             yield session
+        # commit 成功後才執行 (例如讓回應快取失效)，確保之後不會讀到舊資料
+        await run_deferred_tasks(session)
+
+
+@asynccontextmanager
+async def read_session(namespace: str | None = None) -> AsyncIterator[AsyncSession]:
+    """唯讀請求用的 session，依 `ReplicaRouter` 的規則連到 replica 或主庫。
+
+    連線在第一次查詢時才取得，查完立刻歸還；replica 連不上時會自動改用主庫。
+    """
+    bind = await get_replica_router().choose(namespace)
+    async with open_read_session(bind) as session:
+        yield session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, Any]:
+    # 驗證身分等只讀主庫的查詢 (撤銷清單、使用者資料需要最新狀態)
+    async with open_read_session(engine) as session:
+        yield session
+
+
+async def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    # 給 StreamingResponse 用：dependency 的 session 在回應開始送出前就會關閉，
+    # 串流內容需要自己開一個活得夠久的 session (唯讀，可分流到 replica)
+    bind = await get_replica_router().choose_reachable()
+    return async_sessionmaker(bind, expire_on_commit=False)
 
 
 async def get_user_crud(session: Annotated[AsyncSession, Depends(get_session)]) -> UserCrud:
@@ -30,29 +61,81 @@ async def get_item_crud(session: Annotated[AsyncSession, Depends(get_session)])
 def get_current_user_with_token(*, usage: Literal["access", "refresh"]):
     async def wrapper(
         token: OAuth2Token,
-        user_crud: Annotated[UserCrud, Depends(get_user_crud)],
+        session: Annotated[AsyncSession, Depends(get_read_session)],
+        token_service: Annotated[TokenService, Depends(get_token_service)],
+    ) -> UserRead:
+        payload = await token_service.decode_token(token, usage=usage)
+        user_id: int | None = payload.get("id")
+        if user_id is None:
+            raise InvalidToken_401
+        await ensure_not_revoked(session, payload)
+        # token 簽章與效期已驗證過，身分快取命中就不必再查一次 User
+        identity = get_identity_cache().get(user_id)
+        if identity is None:
+            version = identity_version()
+            user = await UserCrud(session).get_row_by_id(user_id)
+            identity = UserRead.model_validate(user)
+            cache_identity(identity, payload, version)
+        return identity
+
+    return wrapper
+
+
+def get_current_user_id_with_token(*, usage: Literal["access", "refresh"]):
+    async def wrapper(
+        token: OAuth2Token,
+        session: Annotated[AsyncSession, Depends(get_read_session)],
         token_service: Annotated[TokenService, Depends(get_token_service)],
-    ) -> User:
+    ) -> int:
+        # 只信任已簽章的 id claim，搭配撤銷清單即可，不必查 User 表
         payload = await token_service.decode_token(token, usage=usage)
         user_id: int | None = payload.get("id")
         if user_id is None:
             raise InvalidToken_401
-        return await user_crud.get_by_id(user_id)
+        await ensure_not_revoked(session, payload)
+        return user_id
 
     return wrapper
 
 
+get_current_user_id_access = get_current_user_id_with_token(usage="access")
+
+
+async def get_item_read_crud(
+    current_user_id: Annotated[int, Depends(get_current_user_id_access)],
+) -> AsyncGenerator[ItemCrud, Any]:
+    # 商品的讀取都限定在目前使用者底下，以他的商品 namespace 判斷是否剛寫入過
+    async with read_session(items_namespace(current_user_id)) as session:
+        yield ItemCrud(session)
+
+
+async def get_user_read_crud() -> AsyncGenerator[UserCrud, Any]:
+    async with read_session() as session:
+        yield UserCrud(session)
+
+
+async def get_user_read_crud_by_path(user_id: int) -> AsyncGenerator[UserCrud, Any]:
+    # 給路徑帶有 {user_id} 的讀取端點使用
+    async with read_session(user_namespace(user_id)) as session:
+        yield UserCrud(session)
+
+
 async def verify_user_ownership(
     user_id: int,
-    current_user: Annotated[User, Depends(get_current_user_with_token(usage="access"))],
+    current_user: Annotated[UserRead, Depends(get_current_user_with_token(usage="access"))],
 ):
     if user_id != current_user.id:
         raise UnauthorizedAccess_403
 
 
 SessionDeps = Annotated[AsyncSession, Depends(get_session)]
+SessionFactoryDeps = Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
 UserCrudDeps = Annotated[UserCrud, Depends(get_user_crud)]
 ItemCrudDeps = Annotated[ItemCrud, Depends(get_item_crud)]
+ItemReadCrudDeps = Annotated[ItemCrud, Depends(get_item_read_crud)]
+UserReadCrudDeps = Annotated[UserCrud, Depends(get_user_read_crud)]
+UserPathReadCrudDeps = Annotated[UserCrud, Depends(get_user_read_crud_by_path)]
+ResponseCacheDeps = Annotated[ResponseCache, Depends(get_response_cache)]
 TokenServiceDeps = Annotated[TokenService, Depends(get_token_service)]
-CurrentUserAccessDeps = Annotated[User, Depends(get_current_user_with_token(usage="access"))]
-CurrentUserRefreshDeps = Annotated[User, Depends(get_current_user_with_token(usage="refresh"))]
+CurrentUserAccessDeps = Annotated[UserRead, Depends(get_current_user_with_token(usage="access"))]
+CurrentUserIdAccessDeps = Annotated[int, Depends(get_current_user_id_access)]
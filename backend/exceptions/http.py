@@ -32,3 +32,31 @@ UnauthorizedAccess_403 = HTTPException(
     status_code=status.HTTP_403_FORBIDDEN,
     detail="無權存取資源",
 )
+
+ServiceBusy_503 = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="伺服器忙碌中，請稍後再試",
+    headers={"Retry-After": "1"},
+)
+
+InvalidCursor_400 = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="無效的分頁游標",
+)
+
+BulkTooLarge_413 = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail="批次資料筆數超過上限",
+)
+
+RevokedToken_401 = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Token 已被撤銷",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+RefreshTokenReused_401 = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Refresh token 重複使用，已撤銷此次登入的所有 token",
+    headers={"WWW-Authenticate": "Bearer"},
+)
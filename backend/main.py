@@ -1,7 +1,11 @@
+import asyncio
+import os
+import tempfile
+
 import uvicorn
 from dotenv import load_dotenv
 
-from config.settings import try_getenv
+from config.settings import get_settings, try_getenv
 
 ENV_FILES = {
     "MAIN": "config/.env",
@@ -20,12 +24,27 @@ def main():
     load_environment("MAIN")
     load_environment(try_getenv("APP_MODE"))
 
+    if get_settings().db_init_mode != "skip":
+        from database.cli import init
+
+        # 在啟動 worker 之前先做一次 schema 初始化，worker 繼承環境變數後就會略過
+        asyncio.run(init())
+        os.environ["DB_INIT_MODE"] = "skip"
+
+    if get_settings().web_workers > 1:
+        from metrics.multiprocess import MetricsStore
+
+        # 每個 worker 有各自的 metrics，透過共用目錄合併後才是整個服務的數據
+        os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="fastapi-metrics-"))
+        MetricsStore(os.environ["METRICS_DIR"]).clear()
+
     uvicorn.run(
         "app:app",
         host=try_getenv("HOST"),
         port=int(try_getenv("PORT")),
         reload=try_getenv("RELOAD").lower() == "true",
-        workers=5,
+        # 每個 worker 各有一個連線池，連線池大小會依 worker 數分配
+        workers=get_settings().web_workers,
     )
 
 
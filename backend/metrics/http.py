@@ -0,0 +1,55 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics.registry import REGISTRY, Counter, Gauge, Histogram
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("http_requests_total", "HTTP requests", ("method", "route", "status"))
+)
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+)
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.register(
+    Gauge("http_requests_in_progress", "HTTP requests being handled", ("method",))
+)
+
+
+def route_template(scope: Scope) -> str:
+    # 用路由樣板 (/api/users/{user_id}) 而不是實際路徑，避免 label 數量無限增長
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """純 ASGI middleware，依 method / 路由 / status 記錄請求數與延遲。"""
+
+    def __init__(self, app: ASGIApp, skip_paths: tuple[str, ...] = ("/metrics",)) -> None:
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+            # 路由比對完成後 Starlette 才會把 route 放進 scope
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(method, route, status)
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route)
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from config.settings import get_settings
+from metrics.registry import REGISTRY, Snapshot, merge
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsStore:
+    """讓多個 uvicorn worker 共用 metrics 的檔案目錄。
+
+    每個 worker 定期把自己的快照寫成 `metrics-<pid>.json`；收到 `/metrics` 的那個 worker
+    讀取目錄中所有檔案再合併，所以不論請求落在哪個 worker，看到的都是全部 worker 的總和。
+    已結束的 worker 留下的 counter 仍會計入 (維持單調遞增)，gauge 則不計。
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, pid: int) -> Path:
+        return self.directory / f"metrics-{pid}.json"
+
+    def write(self, snapshot: Snapshot, pid: int | None = None) -> None:
+        path = self.path(pid or os.getpid())
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot, separators=(",", ":")))
+        # 先寫暫存檔再換名，讀取端不會讀到寫一半的檔案
+        os.replace(tmp, path)
+
+    def read_all(self) -> list[tuple[int, Snapshot]]:
+        snapshots = []
+        for path in self.directory.glob("metrics-*.json"):
+            try:
+                pid = int(path.stem.removeprefix("metrics-"))
+                snapshots.append((pid, json.loads(path.read_text())))
+            except (ValueError, OSError):
+                continue
+        return snapshots
+
+    def clear(self) -> None:
+        for path in self.directory.glob("metrics-*"):
+            path.unlink(missing_ok=True)
+
+
+@lru_cache
+def get_metrics_store() -> MetricsStore | None:
+    directory = get_settings().metrics_dir
+    return MetricsStore(directory) if directory else None
+
+
+def collect() -> Snapshot:
+    """回傳所有 worker 合併後的快照；沒有設定 metrics_dir 時只有目前的 worker。"""
+    snapshot = REGISTRY.snapshot()
+    store = get_metrics_store()
+    if store is None:
+        return merge([(snapshot, True)])
+    store.write(snapshot)
+    pid = os.getpid()
+    return merge(
+        (snapshot if worker == pid else other, worker == pid or is_alive(worker))
+        for worker, other in store.read_all()
+    )
+
+
+async def flush_periodically(store: MetricsStore, interval: float) -> None:
+    # 其他 worker 收到 /metrics 時讀的是這裡寫出的檔案
+    while True:
+        await asyncio.sleep(interval)
+        store.write(REGISTRY.snapshot())
@@ -0,0 +1,184 @@
+import bisect
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from typing import Any
+
+type Labels = tuple[str, ...]
+# 每個 metric 的快照：可轉成 JSON，讓多個 worker 各自寫檔後再合併
+type Snapshot = dict[str, dict[str, Any]]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> list[tuple[Labels, Any]]: ...
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(labels), value] for labels, value in self.samples()],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> list[tuple[Labels, Any]]:
+        return list(self.values.items())
+
+
+class Gauge(Metric):
+    """可直接 inc / dec / set，或在收集時呼叫 `collect` 取得目前的值。"""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        collect: Callable[[], dict[Labels, float]] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[Labels, float] = {}
+        self.collect = collect
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def samples(self) -> list[tuple[Labels, Any]]:
+        if self.collect is not None:
+            return list(self.collect().items())
+        return list(self.values.items())
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每組 label 對應 [各 bucket 的筆數 (非累計，最後一格是 +Inf), sum]
+        self.values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def samples(self) -> list[tuple[Labels, Any]]:
+        return [
+            (labels, [list(counts), total[0]]) for labels, (counts, total) in self.values.items()
+        ]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register[M: Metric](self, metric: M) -> M:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Snapshot:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+
+REGISTRY = Registry()
+
+
+def merge(snapshots: Iterable[tuple[Snapshot, bool]]) -> Snapshot:
+    """合併多個 worker 的快照：counter / histogram 全部相加，gauge 只加總還活著的 worker。"""
+    merged: Snapshot = {}
+    for snapshot, alive in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            if metric["type"] == "gauge" and not alive:
+                continue
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif metric["type"] == "histogram":
+                    counts = [a + b for a, b in zip(current[0], value[0], strict=True)]
+                    target["samples"][key] = [counts, current[1] + value[1]]
+                else:
+                    target["samples"][key] = current + value
+    for metric in merged.values():
+        metric["samples"] = list(metric["samples"].items())
+    return merged
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values, strict=True))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def render(snapshot: Snapshot) -> str:
+    """輸出 Prometheus text exposition format (0.0.4)。"""
+    lines: list[str] = []
+    for name, metric in snapshot.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for labels, value in metric["samples"]:
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{format_labels(labelnames, labels)} {format_value(value)}")
+                continue
+            counts, total = value
+            cumulative = 0
+            bucket_names = [*labelnames, "le"]
+            for bound, count in zip([*metric["buckets"], "+Inf"], counts, strict=True):
+                cumulative += count
+                le = bound if isinstance(bound, str) else format_value(bound)
+                label_text = format_labels(bucket_names, [*labels, le])
+                lines.append(f"{name}_bucket{label_text} {cumulative}")
+            label_text = format_labels(labelnames, labels)
+            lines.append(f"{name}_sum{label_text} {format_value(total)}")
+            lines.append(f"{name}_count{label_text} {cumulative}")
+    return "\n".join(lines) + "\n"
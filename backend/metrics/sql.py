@@ -0,0 +1,164 @@
+import logging
+import time
+from collections import Counter as Tally
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics.http import route_template
+from metrics.registry import REGISTRY, Counter, Histogram
+
+logger = logging.getLogger("uvicorn.error")
+
+DB_QUERY_DURATION = REGISTRY.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "SQL statement execution time (only with SQL_INSTRUMENTATION)",
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+    )
+)
+DB_SLOW_QUERIES = REGISTRY.register(
+    Counter("db_slow_queries_total", "SQL statements over SLOW_QUERY_MS")
+)
+DB_N_PLUS_ONE = REGISTRY.register(
+    Counter("db_n_plus_one_total", "Requests with repeated lazy loads", ("route", "relationship"))
+)
+
+
+@dataclass
+class QueryStats:
+    """一個請求期間送出的 SQL 統計。"""
+
+    count: int = 0
+    seconds: float = 0.0
+    # relationship ("User.items") -> 這個請求中 lazy load 的次數
+    lazy_loads: Tally[str] = field(default_factory=Tally)
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+
+    def n_plus_one(self, threshold: int) -> dict[str, int]:
+        return {key: count for key, count in self.lazy_loads.items() if count >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+current_stats: ContextVar[QueryStats | None] = ContextVar("current_stats", default=None)
+
+# 已掛上事件的 engine -> 慢查詢門檻 (秒)，重複呼叫 instrument_engine 只會更新門檻
+slow_query_thresholds: WeakKeyDictionary[Engine, float] = WeakKeyDictionary()
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_seconds: float) -> None:
+    """在 engine 上掛 cursor 事件，把每個 statement 的耗時記到目前請求的 QueryStats。
+
+    AsyncSession 在 greenlet 中執行同步的 SQLAlchemy 程式碼，SQLAlchemy 會把 contextvars
+    帶進 greenlet，所以事件裡讀得到 middleware 設定的 `current_stats`。
+    """
+    sync_engine = engine.sync_engine
+    instrumented = sync_engine in slow_query_thresholds
+    slow_query_thresholds[sync_engine] = slow_query_seconds
+    if instrumented:
+        return
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_DURATION.observe(elapsed)
+        stats = current_stats.get()
+        if stats is not None:
+            stats.record(elapsed)
+        if elapsed >= slow_query_thresholds[sync_engine]:
+            DB_SLOW_QUERIES.inc()
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split()))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def record_lazy_load(orm_execute_state: ORMExecuteState) -> None:
+    # lazy="select" 的 relationship 每讀一個物件就多一個 SELECT，是 N+1 的來源
+    stats = current_stats.get()
+    if stats is None or not orm_execute_state.is_select:
+        return
+    parent = orm_execute_state.lazy_loaded_from
+    if parent is None or not orm_execute_state.is_relationship_load:
+        return
+    for relationship in parent.mapper.relationships:
+        if relationship.mapper is orm_execute_state.bind_mapper:
+            stats.lazy_loads[f"{parent.class_.__name__}.{relationship.key}"] += 1
+            return
+    stats.lazy_loads[parent.class_.__name__] += 1
+
+
+class QueryStatsMiddleware:
+    """統計每個請求的 SQL 數量與耗時，寫入 `Server-Timing` header 與 log，並警告 N+1。
+
+    串流回應 (例如 GET /api/users) 不加 header，統計只記在請求結束時的 log。
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 3) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_stats.set(stats)
+
+        start: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # 要等第一段 body 才知道是不是串流回應，先把 start 留著
+                start = message
+                return
+            if start is not None:
+                # 一次送完的回應：FastAPI 送出前就已結束 dependency (含 commit)，統計是完整的；
+                # 串流回應的查詢大多在 header 送出之後才執行，不加 header，只留 log
+                if message["type"] == "http.response.body" and not message.get("more_body"):
+                    MutableHeaders(scope=start).append("Server-Timing", stats.server_timing())
+                await send(start)
+                start = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
+            self.report(scope, stats)
+
+    def report(self, scope: Scope, stats: QueryStats) -> None:
+        route = route_template(scope)
+        logger.info(
+            "%s %s: %d queries, %.2f ms", scope["method"], route, stats.count, stats.seconds * 1000
+        )
+        for relationship, count in stats.n_plus_one(self.n_plus_one_threshold).items():
+            DB_N_PLUS_ONE.inc(route, relationship)
+            logger.warning(
+                "N+1 lazy load on %s: loaded %d times in %s %s",
+                relationship,
+                count,
+                scope["method"],
+                route,
+            )
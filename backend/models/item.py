@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base, enable_repr
@@ -27,3 +27,8 @@ class Item(Base):
 
     # back populates
     user: Mapped["User"] = relationship(back_populates="items")  # noqa: F821, UP037 # type: ignore
+
+
+# 列表 / 計數 / 擁有權檢查都以 user_id 過濾並依 id 倒序，建複合索引讓它們走 index scan
+# (既有資料庫由 database/migrations.py 以 CONCURRENTLY 補建)
+Index("ix_Item_user_id_id", Item.user_id, Item.id.desc())
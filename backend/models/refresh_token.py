@@ -0,0 +1,21 @@
+from sqlalchemy import Boolean, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base, enable_repr
+
+
+@enable_repr
+class RefreshToken(Base):
+    __tablename__ = "RefreshToken"
+
+    # columns
+    # 每個 refresh token 的 jti，刷新時以主鍵直接查找
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # 同一次登入輪替出來的 token 屬於同一個家族，偵測到重複使用時整個家族一起撤銷
+    family_id: Mapped[str] = mapped_column(String(32), index=True)
+    # 不設 foreign key：使用者被刪除時改由 TokenRevocation 讓 token 失效
+    user_id: Mapped[int] = mapped_column(Integer)
+    # 過期 (epoch 秒) 之後即可清除
+    expires_at: Mapped[float] = mapped_column(Float, index=True)
+    used: Mapped[bool] = mapped_column(Boolean, default=False)
+    revoked: Mapped[bool] = mapped_column(Boolean, default=False)
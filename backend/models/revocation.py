@@ -0,0 +1,17 @@
+from sqlalchemy import Float, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from models.base import Base, enable_repr
+
+
+@enable_repr
+class TokenRevocation(Base):
+    __tablename__ = "TokenRevocation"
+
+    # columns
+    # 不設 foreign key：使用者被刪除後，撤銷紀錄仍要保留到舊 token 全部過期
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # iat 早於此時間 (epoch 秒) 的 token 一律失效
+    revoked_before: Mapped[float] = mapped_column(Float)
+    # 供各 worker 增量同步撤銷清單
+    updated_at: Mapped[float] = mapped_column(Float, index=True)
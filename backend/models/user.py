@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Integer, String
+from sqlalchemy import Date, DateTime, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import Base, enable_repr
@@ -20,6 +20,8 @@ class User(Base):
     avatar: Mapped[str | None] = mapped_column(String(50), nullable=True)
     birthday: Mapped[date] = mapped_column(Date)
     email: Mapped[str] = mapped_column(String(50), unique=True)
+    # 商品數 (反正規化)，由 ItemCrud 在同一個交易中維護，偏差由 reconcile_item_counts 修正
+    item_count: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     update_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now, onupdate=datetime.now
@@ -0,0 +1,59 @@
+"""TokenService 驗證成本的 micro-benchmark。
+
+比較 python-jose `jwt.decode` 與 `TokenService.decode_token` (首次驗證 / 快取命中) 的單次成本：
+
+    cd backend && python -m performance.bench_token
+
+python-jose 只在 test 依賴群組中 (`uv sync --group test`)。
+"""
+
+import asyncio
+import os
+import timeit
+
+from jose import jwt
+
+os.environ.setdefault("APP_MODE", "TEST")
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("RELOAD", "false")
+os.environ.setdefault("DATABASE_URI", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("ACCESS_TOKEN_SECRET", "bench-access-secret")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+os.environ.setdefault("REFRESH_TOKEN_SECRET", "bench-refresh-secret")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_MINUTES", "1440")
+
+from auth.token import TokenService  # noqa: E402
+
+NUMBER = 20000
+
+
+def report(name: str, seconds: float) -> None:
+    print(f"{name:<32} {seconds / NUMBER * 1e6:8.2f} us/op")
+
+
+def main() -> None:
+    service = TokenService()
+    secret = os.environ["ACCESS_TOKEN_SECRET"]
+    token = asyncio.run(service.generate_token({"id": 1}, usage="access"))
+    codec = service.codecs["access"]
+
+    report("jose jwt.decode", timeit.timeit(lambda: jwt.decode(token, secret), number=NUMBER))
+
+    def verify_uncached() -> None:
+        codec.verified.clear()
+        codec.verify(token)
+
+    report("HS256Codec.verify (uncached)", timeit.timeit(verify_uncached, number=NUMBER))
+    report("HS256Codec.verify (cached)", timeit.timeit(lambda: codec.verify(token), number=NUMBER))
+    report(
+        "jose jwt.encode",
+        timeit.timeit(lambda: jwt.encode({"id": 1, "usage": "access"}, secret), number=NUMBER),
+    )
+    report(
+        "HS256Codec.sign",
+        timeit.timeit(lambda: codec.sign({"id": 1, "usage": "access"}), number=NUMBER),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""無互動的 benchmark：依情境對 API 施壓，輸出延遲百分位與吞吐量，並與 baseline 比較。
+
+不指定 `--host` 時在同一個 process 內以 ASGI 直接呼叫 app，資料庫用暫存的 SQLite 檔案代替；
+指定 `--host` 則對已啟動的服務 (例如 docker compose 的 Postgres 環境) 發送 HTTP 請求：
+
+    cd backend && python -m performance.benchmark read-heavy
+    cd backend && python -m performance.benchmark login-storm --concurrency 20 --duration 30
+    cd backend && python -m performance.benchmark deep-pagination --host http://localhost:8000
+    cd backend && python -m performance.benchmark write-heavy --update-baseline
+
+結果寫到 `performance/results/<情境>.json`；若 `performance/baselines/<情境>.json` 存在，
+p95 變慢或吞吐量下降超過 `--tolerance`、或違反情境本身的 SLO 時以 exit code 1 結束。
+baseline 與機器有關，請在同一台 CI runner 上以 `--update-baseline` 產生。
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+DIRECTORY = Path(__file__).parent
+PASSWORD = "benchPass123"
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    # nearest-rank，樣本少時也不會內插出不存在的值
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(0, rank - 1)]
+
+
+def summarize(latencies: list[float], errors: int, seconds: float) -> dict[str, float]:
+    values = sorted(latencies)
+    requests = len(values) + errors
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "throughput_rps": round(requests / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+
+@dataclass
+class Recorder:
+    """依端點名稱收集每個請求的延遲 (只計入成功的請求) 與錯誤數。"""
+
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    recording: bool = False
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        name: str,
+        method: str,
+        url: str,
+        expected: int = 200,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - start
+        ok = response is not None and response.status_code == expected
+        if self.recording:
+            if ok:
+                self.latencies.setdefault(name, []).append(elapsed)
+            else:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return response if ok else None
+
+    def report(self, seconds: float) -> dict[str, Any]:
+        names = sorted({*self.latencies, *self.errors})
+        endpoints = {
+            name: summarize(self.latencies.get(name, []), self.errors.get(name, 0), seconds)
+            for name in names
+        }
+        every = [latency for values in self.latencies.values() for latency in values]
+        return {
+            "totals": summarize(every, sum(self.errors.values()), seconds),
+            "endpoints": endpoints,
+        }
+
+
+@dataclass
+class Actor:
+    """一個模擬使用者：擁有自己的帳號、token 與商品。"""
+
+    client: httpx.AsyncClient
+    recorder: Recorder
+    email: str
+    user_id: int = 0
+    headers: dict[str, str] = field(default_factory=dict)
+    item_ids: list[int] = field(default_factory=list)
+    cursor: str | None = None
+
+    async def sign_up(self) -> None:
+        payload = {
+            "name": "bench",
+            "email": self.email,
+            "password": PASSWORD,
+            "age": 30,
+            "birthday": "1990-01-01",
+        }
+        response = await self.recorder.call(
+            self.client, "POST /api/users", "POST", "/api/users", 201, json=payload
+        )
+        if response is None:
+            raise RuntimeError(f"Failed to create benchmark user {self.email}")
+        self.user_id = response.json()["id"]
+        await self.login()
+
+    async def login(self) -> bool:
+        response = await self.recorder.call(
+            self.client,
+            "POST /api/auth/login",
+            "POST",
+            "/api/auth/login",
+            data={"username": self.email, "password": PASSWORD},
+        )
+        if response is not None:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response is not None
+
+    async def seed_items(self, count: int, chunk: int = 500) -> None:
+        for start in range(0, count, chunk):
+            response = await self.recorder.call(
+                self.client,
+                "POST /api/items/bulk",
+                "POST",
+                "/api/items/bulk",
+                201,
+                headers=self.headers,
+                json=[new_item(index) for index in range(start, min(count, start + chunk))],
+            )
+            if response is None:
+                raise RuntimeError("Failed to seed benchmark items")
+            self.item_ids.extend(item["id"] for item in response.json())
+
+
+def new_item(index: int = 0) -> dict[str, Any]:
+    return {
+        "name": f"bench-item-{index}",
+        "price": round(random.uniform(10, 1000), 2),
+        "brand": "Bench",
+        "description": "generated by performance.benchmark",
+        "stock": random.randint(0, 100),
+    }
+
+
+async def read_heavy(actor: Actor) -> None:
+    call, client, headers = actor.recorder.call, actor.client, actor.headers
+    roll = random.random()
+    if roll < 0.6:
+        await call(client, "GET /api/items", "GET", "/api/items?page_size=20", headers=headers)
+    elif roll < 0.9:
+        item_id = random.choice(actor.item_ids)
+        await call(client, "GET /api/items/{id}", "GET", f"/api/items/{item_id}", headers=headers)
+    else:
+        await call(client, "GET /api/users/{id}", "GET", f"/api/users/{actor.user_id}")
+
+
+async def write_heavy(actor: Actor) -> None:
+    call, client, headers = actor.recorder.call, actor.client, actor.headers
+    roll = random.random()
+    if roll < 0.5 or len(actor.item_ids) < 2:
+        response = await call(
+            client, "POST /api/items", "POST", "/api/items", 201, headers=headers, json=new_item()
+        )
+        if response is not None:
+            actor.item_ids.append(response.json()["id"])
+    elif roll < 0.8:
+        item_id = random.choice(actor.item_ids)
+        await call(
+            client,
+            "PATCH /api/items/{id}",
+            "PATCH",
+            f"/api/items/{item_id}",
+            headers=headers,
+            json={"stock": random.randint(0, 100)},
+        )
+    else:
+        item_id = actor.item_ids.pop(random.randrange(len(actor.item_ids)))
+        await call(
+            client,
+            "DELETE /api/items/{id}",
+            "DELETE",
+            f"/api/items/{item_id}",
+            204,
+            headers=headers,
+        )
+
+
+async def login_storm(actor: Actor) -> None:
+    await actor.login()
+
+
+async def deep_pagination(actor: Actor) -> None:
+    call, client, headers = actor.recorder.call, actor.client, actor.headers
+    page_size = 20
+    if random.random() < 0.5:
+        # 最後 10% 的頁數：OFFSET 越深掃越多列
+        pages = len(actor.item_ids) // page_size
+        page = random.randint(max(1, pages - pages // 10), max(1, pages))
+        url = f"/api/items?page={page}&page_size={page_size}"
+        await call(client, "GET /api/items (offset)", "GET", url, headers=headers)
+        return
+    url = f"/api/items?mode=cursor&page_size={page_size}"
+    if actor.cursor is not None:
+        url += f"&after={actor.cursor}"
+    response = await call(client, "GET /api/items (cursor)", "GET", url, headers=headers)
+    actor.cursor = response.json()["next_cursor"] if response is not None else None
+
+
+async def bulk_import(actor: Actor) -> None:
+    call, client, headers = actor.recorder.call, actor.client, actor.headers
+    response = await call(
+        client,
+        "POST /api/items/bulk",
+        "POST",
+        "/api/items/bulk",
+        201,
+        headers=headers,
+        json=[new_item(index) for index in range(100)],
+    )
+    if response is not None:
+        # 刪掉剛匯入的商品，資料量不會隨時間增長而影響之後的結果
+        ids = [item["id"] for item in response.json()]
+        await call(
+            client,
+            "DELETE /api/items/bulk",
+            "DELETE",
+            "/api/items/bulk",
+            204,
+            headers=headers,
+            json={"ids": ids},
+        )
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    step: Callable[[Actor], Awaitable[None]]
+    # 每個模擬使用者事先建立的商品數
+    seed_items: int
+    # 不論 baseline 為何都必須滿足的上限
+    slo_p95_ms: float
+    slo_error_rate: float = 0.01
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("read-heavy", "90% list / get, 10% public profile", read_heavy, 50, 100.0),
+        Scenario("write-heavy", "create / patch / delete items", write_heavy, 20, 150.0),
+        Scenario("login-storm", "every step is a password login", login_storm, 0, 2000.0),
+        Scenario(
+            "deep-pagination", "offset pages near the end vs cursor", deep_pagination, 2000, 200.0
+        ),
+        Scenario("bulk-import", "import then delete 100 items", bulk_import, 0, 1000.0),
+    )
+}
+
+
+@asynccontextmanager
+async def open_client(host: str | None) -> AsyncIterator[httpx.AsyncClient]:
+    if host is not None:
+        async with httpx.AsyncClient(base_url=host, timeout=30) as client:
+            yield client
+        return
+
+    # 同一個 process 內直接呼叫 app，用暫存的 SQLite 檔案代替 Postgres
+    directory = tempfile.mkdtemp(prefix="benchmark-")
+    os.environ.update(
+        {
+            "APP_MODE": "TEST",
+            "PORT": "8000",
+            "RELOAD": "false",
+            "DATABASE_URI": f"sqlite+aiosqlite:///{directory}/benchmark.db",
+            "ACCESS_TOKEN_SECRET": "benchmark-access-secret",
+            "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+            "REFRESH_TOKEN_SECRET": "benchmark-refresh-secret",
+            "REFRESH_TOKEN_EXPIRE_MINUTES": "1440",
+        }
+    )
+    from app import app, lifespan
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            yield client
+
+
+async def run(scenario: Scenario, args: argparse.Namespace) -> dict[str, Any]:
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    async with open_client(args.host) as client:
+        actors = [
+            Actor(client, recorder, f"bench-{run_id}-{index}@example.com")
+            for index in range(args.concurrency)
+        ]
+        for actor in actors:
+            await actor.sign_up()
+            await actor.seed_items(scenario.seed_items)
+
+        async def loop(actor: Actor, until: float) -> None:
+            while time.perf_counter() < until:
+                await scenario.step(actor)
+
+        await asyncio.gather(*(loop(actor, time.perf_counter() + args.warmup) for actor in actors))
+        recorder.recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*(loop(actor, started + args.duration) for actor in actors))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": scenario.name,
+        "description": scenario.description,
+        "target": args.host or "in-process (sqlite)",
+        "concurrency": args.concurrency,
+        "duration_seconds": round(elapsed, 3),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        **recorder.report(elapsed),
+    }
+
+
+def check(result: dict[str, Any], scenario: Scenario, baseline: dict | None, tolerance: float):
+    """回傳違反的 gate；空 list 代表通過。"""
+    totals = result["totals"]
+    failures = []
+    if totals["requests"] == 0:
+        failures.append("no requests completed")
+    if totals["p95_ms"] > scenario.slo_p95_ms:
+        failures.append(f"p95 {totals['p95_ms']}ms over SLO {scenario.slo_p95_ms}ms")
+    if totals["error_rate"] > scenario.slo_error_rate:
+        failures.append(f"error rate {totals['error_rate']} over SLO {scenario.slo_error_rate}")
+    if baseline is not None:
+        base = baseline["totals"]
+        if totals["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(f"p95 {totals['p95_ms']}ms regressed from {base['p95_ms']}ms")
+        if totals["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            failures.append(
+                f"throughput {totals['throughput_rps']}rps regressed "
+                f"from {base['throughput_rps']}rps"
+            )
+    return failures
+
+
+def print_result(result: dict[str, Any], baseline: dict | None) -> None:
+    print(f"{result['scenario']} against {result['target']}, {result['concurrency']} users\n")
+    header = f"  {'endpoint':<28} {'req':>7} {'err':>5} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    rows = [*result["endpoints"].items(), ("total", result["totals"])]
+    for name, stats in rows:
+        print(
+            f"  {name:<28} {stats['requests']:>7} {stats['errors']:>5} "
+            f"{stats['throughput_rps']:>9.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+    if baseline is not None:
+        base = baseline["totals"]
+        print(f"\n  baseline: {base['throughput_rps']} rps, p95 {base['p95_ms']} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m performance.benchmark")
+    parser.add_argument("scenario", choices=SCENARIOS)
+    parser.add_argument("--host", help="已啟動的服務網址；不指定則在同一個 process 內執行")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="計入結果的秒數")
+    parser.add_argument("--warmup", type=float, default=2.0, help="不計入結果的暖機秒數")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="相對 baseline 可接受的退步比例"
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    scenario = SCENARIOS[args.scenario]
+    output = args.output or DIRECTORY / "results" / f"{scenario.name}.json"
+    baseline_path = args.baseline or DIRECTORY / "baselines" / f"{scenario.name}.json"
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+
+    result = asyncio.run(run(scenario, args))
+    failures = check(result, scenario, None if args.update_baseline else baseline, args.tolerance)
+    result["failures"] = failures
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+    print_result(result, baseline)
+    print(f"\n  result written to {output}")
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n")
+        print(f"  baseline updated: {baseline_path}")
+
+    if failures:
+        print("\nFAILED:\n" + "\n".join(f"  - {failure}" for failure in failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
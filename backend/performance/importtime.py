@@ -0,0 +1,80 @@
+"""worker 啟動時 `import app` 的耗時報告。
+
+在新的 process 中以 `python -X importtime` 載入 app，依頂層套件加總各模組自身的耗時，
+列出最慢的套件與模組；總耗時超過預算 (`STARTUP_BUDGET_SECONDS`) 時以 exit code 1 結束，
+可當成 CI 檢查：
+
+    cd backend && python -m performance.importtime
+    cd backend && python -m performance.importtime --top 20 --budget 0.8
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import Counter
+
+TEST_ENVIRONMENT = {
+    "APP_MODE": "TEST",
+    "PORT": "8000",
+    "RELOAD": "false",
+    "DATABASE_URI": "sqlite+aiosqlite:///:memory:",
+    "ACCESS_TOKEN_SECRET": "importtime-access-secret",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "15",
+    "REFRESH_TOKEN_SECRET": "importtime-refresh-secret",
+    "REFRESH_TOKEN_EXPIRE_MINUTES": "1440",
+}
+
+
+def measure(module: str) -> list[tuple[str, int, int]]:
+    """回傳 (模組名稱, 自身耗時 us, 累計耗時 us)，順序與 `-X importtime` 的輸出相同。"""
+    env = {**TEST_ENVIRONMENT, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m performance.importtime")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=float(os.getenv("STARTUP_BUDGET_SECONDS", "1.0")),
+        help="import 總耗時上限 (秒)",
+    )
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    total = next(cumulative for name, _, cumulative in rows if name == args.module) / 1e6
+    packages = Counter[str]()
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"import {args.module}: {total:.3f}s (budget {args.budget:.3f}s)\n")
+    print("slowest packages (self time, summed):")
+    for package, self_us in packages.most_common(args.top):
+        print(f"  {package:<32} {self_us / 1000:8.1f} ms")
+    print("\nslowest modules (self time):")
+    for name, self_us, _ in sorted(rows, key=lambda row: row[1], reverse=True)[: args.top]:
+        print(f"  {name:<48} {self_us / 1000:8.1f} ms")
+
+    if total > args.budget:
+        print(f"\nover budget by {total - args.budget:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
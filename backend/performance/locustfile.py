@@ -1,58 +1,168 @@
+"""Locust 壓測模型。
+
+    locust -H http://localhost:8000 -f backend/performance/locustfile.py
+
+帳號來源 (`--user-pool`)：
+
+- 0 (預設)：每個模擬使用者自己註冊一個帳號，email 以 process 隨機前綴 + 流水號組成，
+  分散式執行時各 worker 不會撞名。註冊與登入都要算 bcrypt，會佔掉不少 server 時間。
+- N > 0：使用事先建立好的 N 個帳號 (`{prefix}-{n}@example.com`，密碼相同)，
+  穩定狀態的量測不包含註冊；加上 `--seed-pool` 會在測試開始前透過 API 補建缺少的帳號。
+  分散式執行時以 `--shard-count` (= worker 數) 把帳號切成不重疊的區段，每個 worker 只用自己那段。
+
+token 在同一個 worker 的模擬使用者之間共用，快過期前主動 refresh；
+登入 / refresh 失敗時以有上限的指數退避重試，不會卡在無限迴圈裡。
+"""
+
+import base64
+import itertools
 import json
 import random
-from collections.abc import Callable
+import time
+import uuid
 from datetime import datetime
-from functools import wraps
+from typing import Any
+
+import gevent
+import requests
+from gevent.lock import Semaphore
+from gevent.pool import Pool
+from locust import HttpUser, between, events, task
+from locust.exception import RescheduleTask, StopUser
+
+PASSWORD = "securePass123"
+# access token 剩下不到這麼多秒就先 refresh
+REFRESH_MARGIN_SECONDS = 30
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 0.5
+
+# 同一個 process 內的模擬使用者流水號與 email 前綴
+USER_COUNTER = itertools.count()
+PROCESS_ID = uuid.uuid4().hex[:12]
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser) -> None:
+    parser.add_argument("--user-pool", type=int, default=0, help="事先建立的帳號數，0 表示每人註冊")
+    parser.add_argument("--user-prefix", default="load", help="帳號 email 前綴")
+    parser.add_argument("--shard-count", type=int, default=1, help="分散式執行時的 worker 數")
+    parser.add_argument("--seed-pool", action="store_true", help="測試開始前補建帳號池")
+
+
+def pool_email(prefix: str, index: int) -> str:
+    return f"{prefix}-{index}@example.com"
+
+
+def signup_payload(email: str) -> dict[str, Any]:
+    return {
+        "name": email.split("@")[0][:30],
+        "email": email,
+        "password": PASSWORD,
+        "age": random.randint(18, 60),
+        "birthday": datetime(1990, 1, 1).strftime("%Y-%m-%d"),
+    }
+
+
+def backoff(attempt: int) -> None:
+    # 指數退避加上隨機抖動，避免大量使用者同時重試
+    gevent.sleep(BACKOFF_SECONDS * 2**attempt * random.uniform(0.5, 1.5))
 
-from locust import HttpUser, between, task
 
+def token_expiry(token: str) -> float:
+    # 只讀 exp claim 決定何時 refresh，不驗證簽章 (那是 server 的工作)
+    payload = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"]
 
-def ensure_login(func: Callable[["WebsiteUser"], bool]):
-    @wraps(func)
-    def wrapper(self: "WebsiteUser", *args, **kwargs):
-        # 確保 login
-        if not hasattr(self, "headers"):
-            while not self.login():
-                self.login()
-        # 執行 task
-        expired = func(self, *args, **kwargs)
-        # 替換過期 access token
-        if expired:
-            while not self.refresh():
-                self.refresh()
 
-    return wrapper
+@events.test_start.add_listener
+def seed_pool(environment, **kwargs) -> None:
+    options = environment.parsed_options
+    # 只在 master (或單機執行) 補建一次，worker 不需要重複
+    if options is None or not options.seed_pool or not options.user_pool:
+        return
+    if environment.runner is not None and type(environment.runner).__name__ == "WorkerRunner":
+        return
+
+    session = requests.Session()
+
+    def ensure_account(index: int) -> bool:
+        email = pool_email(options.user_prefix, index)
+        login = {"username": email, "password": PASSWORD}
+        if session.post(f"{environment.host}/api/auth/login", data=login).status_code == 200:
+            return True
+        response = session.post(f"{environment.host}/api/users", json=signup_payload(email))
+        return response.status_code == 201
+
+    created = Pool(20).map(ensure_account, range(options.user_pool))
+    print(f"user pool ready: {sum(created)}/{options.user_pool} accounts")
+
+
+class TokenStore:
+    """同一個 worker 的模擬使用者共用各帳號的 token，重新開始時不必再登入 (bcrypt)。"""
+
+    def __init__(self) -> None:
+        self.tokens: dict[str, dict[str, Any]] = {}
+        self.locks: dict[str, Semaphore] = {}
+
+    def lock(self, email: str) -> Semaphore:
+        return self.locks.setdefault(email, Semaphore())
+
+    def get(self, email: str) -> dict[str, Any] | None:
+        return self.tokens.get(email)
+
+    def set(self, email: str, access_token: str, refresh_token: str) -> dict[str, Any]:
+        entry = {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "expires_at": token_expiry(access_token),
+        }
+        self.tokens[email] = entry
+        return entry
+
+    def discard(self, email: str) -> None:
+        self.tokens.pop(email, None)
+
+
+TOKENS = TokenStore()
 
 
 class WebsiteUser(HttpUser):
     wait_time = between(1, 3)
-    serial_num = 1
 
-    def on_start(self):
-        while not self.create_user():
-            self.create_user()
-        self.login()
+    def on_start(self) -> None:
+        options = self.environment.parsed_options
+        serial = next(USER_COUNTER)
+        self.item_ids: list[int] = []
+        if options is not None and options.user_pool:
+            self.email = pool_email(options.user_prefix, self.pool_index(serial, options))
+            try:
+                self.load_item_ids()
+            except RescheduleTask:
+                # 重試後仍無法登入：帳號不存在或密碼不符，這個模擬使用者直接停止
+                raise StopUser() from None
+            return
+        prefix = options.user_prefix if options is not None else "load"
+        self.email = f"{prefix}-{PROCESS_ID}-{serial}@example.com"
+        if not self.with_retry(self.create_user):
+            raise StopUser()
+
+    def pool_index(self, serial: int, options) -> int:
+        # 每個 worker 使用不重疊的帳號區段；模擬使用者比帳號多時在區段內循環共用
+        shards = max(1, options.shard_count)
+        shard = getattr(self.environment.runner, "worker_index", 0) % shards
+        size = max(1, options.user_pool // shards)
+        return shard * size + serial % size
+
+    def with_retry(self, action) -> bool:
+        for attempt in range(MAX_ATTEMPTS):
+            if action():
+                return True
+            backoff(attempt)
+        return False
 
     def create_user(self) -> bool:
-        self.name = f"CrazyFriday{WebsiteUser.serial_num}"
-        self.email = f"user{WebsiteUser.serial_num}@example.com"
-        self.password = "securePass123"
-        self.age = random.randint(18, 60)
-        self.birthday = datetime(1990, 1, 1).strftime("%Y-%m-%d")
-        self.item_ids: list[int] = []
-        WebsiteUser.serial_num += 1
-        payload = {
-            "name": self.name,
-            "email": self.email,
-            "password": self.password,
-            "age": self.age,
-            "birthday": self.birthday,
-        }
         with self.client.post(
-            "/api/users",
-            data=json.dumps(payload),
-            headers={"Content-Type": "application/json"},
-            catch_response=True,
+            "/api/users", json=signup_payload(self.email), catch_response=True
         ) as response:
             if response.status_code == 201:
                 response.success()
@@ -61,62 +171,79 @@ class WebsiteUser(HttpUser):
             return response.status_code == 201
 
     def login(self) -> bool:
-        payload = {
-            "username": self.email,
-            "password": self.password,
-            "grant_type": "password",
-        }
+        payload = {"username": self.email, "password": PASSWORD, "grant_type": "password"}
         with self.client.post("/api/auth/login", data=payload, catch_response=True) as response:
-            if response.status_code == 200:
-                data = response.json()
-                self.access_token = data["access_token"]
-                self.refresh_token = data["refresh_token"]
-                self.headers = {
-                    "Authorization": f"Bearer {self.access_token}",
-                    "Content-Type": "application/json",
-                }
-            else:
+            if response.status_code != 200:
                 response.failure("Login failed")
-
-            return response.status_code == 200
+                return False
+            data = response.json()
+            TOKENS.set(self.email, data["access_token"], data["refresh_token"])
+            return True
 
     def refresh(self) -> bool:
-        self.headers = {
-            "Authorization": f"Bearer {self.refresh_token}",
-            "Content-Type": "application/json",
-        }
+        entry = TOKENS.get(self.email)
+        if entry is None:
+            return False
+        headers = {"Authorization": f"Bearer {entry['refresh_token']}"}
         with self.client.post(
-            "/api/auth/refresh", headers=self.headers, catch_response=True
+            "/api/auth/refresh", headers=headers, catch_response=True
         ) as response:
-            if response.status_code == 200:
-                response.success()
-                data = response.json()
-                self.access_token = data["access_token"]
-                self.refresh_token = data["refresh_token"]
-                self.headers = {
-                    "Authorization": f"Bearer {self.access_token}",
-                    "Content-Type": "application/json",
-                }
-            else:
+            if response.status_code != 200:
                 response.failure("Refresh failed")
+                TOKENS.discard(self.email)
+                return False
+            data = response.json()
+            TOKENS.set(self.email, data["access_token"], data["refresh_token"])
+            return True
+
+    @property
+    def headers(self) -> dict[str, str]:
+        entry = TOKENS.get(self.email)
+        if entry is None or entry["expires_at"] - time.time() < REFRESH_MARGIN_SECONDS:
+            entry = self.renew()
+        return {"Authorization": f"Bearer {entry['access_token']}"}
+
+    def renew(self) -> dict[str, Any]:
+        """即將過期時先 refresh，失敗才登入，都失敗則略過這次 task。
 
-            return response.status_code == 200
+        共用帳號的模擬使用者一次只有一個會 refresh / 登入，其他人等它完成後直接沿用；
+        同一個 refresh token 被用兩次會觸發重用偵測，把整個 token family 撤銷。
+        """
+        with TOKENS.lock(self.email):
+            entry = TOKENS.get(self.email)
+            if entry is not None and entry["expires_at"] - time.time() >= REFRESH_MARGIN_SECONDS:
+                return entry
+            if (entry is not None and self.refresh()) or self.with_retry(self.login):
+                return TOKENS.get(self.email)
+        raise RescheduleTask()
+
+    def check(self, response, expected: int, name: str) -> bool:
+        if response.status_code == expected:
+            response.success()
+            return True
+        if response.status_code == 401:
+            # token 被撤銷或過期：下一次 task 重新取得
+            TOKENS.discard(self.email)
+        response.failure(f"{name} failed ({response.status_code})")
+        return False
+
+    def load_item_ids(self) -> None:
+        # 事先建立的帳號可能已經有商品
+        with self.client.get(
+            "/api/items?page_size=50", headers=self.headers, catch_response=True
+        ) as response:
+            if self.check(response, 200, "load_item_ids"):
+                self.item_ids = [item["id"] for item in response.json()["items"]]
 
     @task(3)
-    @ensure_login
-    def get_all_items(self) -> bool:
+    def get_all_items(self) -> None:
         with self.client.get(
             "/api/items?page=1&page_size=10", headers=self.headers, catch_response=True
         ) as response:
-            if response.status_code == 200 or response.status_code == 401:
-                response.success()
-            else:
-                response.failure("get_all_items failed")
-            return response.status_code == 401
+            self.check(response, 200, "get_all_items")
 
     @task(5)
-    @ensure_login
-    def create_item(self) -> bool:
+    def create_item(self) -> None:
         item = {
             "name": "pressure-cooker",
             "price": round(random.uniform(10, 1000), 2),
@@ -125,74 +252,58 @@ class WebsiteUser(HttpUser):
             "stock": random.randint(1, 100),
         }
         with self.client.post(
-            "/api/items", headers=self.headers, data=json.dumps(item), catch_response=True
+            "/api/items", headers=self.headers, json=item, catch_response=True
         ) as response:
-            if response.status_code == 201:
-                response.success()
-                item_id: int = response.json()["id"]
-                self.item_ids.append(item_id)
-            elif response.status_code == 401:
-                response.success()
-            else:
-                response.failure("create_item failed")
-            return response.status_code == 401
+            if self.check(response, 201, "create_item"):
+                self.item_ids.append(response.json()["id"])
 
     @task(2)
-    @ensure_login
-    def get_item_by_id(self) -> bool:
-        if self.item_ids:
-            item_id = random.choice(self.item_ids)
-            with self.client.get(
-                f"/api/items/{item_id}", headers=self.headers, catch_response=True
-            ) as response:
-                if response.status_code == 200 or response.status_code == 401:
-                    response.success()
-                else:
-                    response.failure("get_item_by_id failed")
-                return response.status_code == 401
+    def get_item_by_id(self) -> None:
+        if not self.item_ids:
+            return
+        item_id = random.choice(self.item_ids)
+        with self.client.get(
+            f"/api/items/{item_id}",
+            headers=self.headers,
+            name="/api/items/{item_id}",
+            catch_response=True,
+        ) as response:
+            self.check(response, 200, "get_item_by_id")
 
     @task(2)
-    @ensure_login
-    def update_item(self) -> bool:
-        if self.item_ids:
-            item_id = random.choice(self.item_ids)
-            update_data = {
-                "description": "Update description!",
-                "stock": random.randint(1, 50),
-            }
-            with self.client.patch(
-                f"/api/items/{item_id}",
-                headers=self.headers,
-                data=json.dumps(update_data),
-                catch_response=True,
-            ) as response:
-                if response.status_code == 200 or response.status_code == 401:
-                    response.success()
-                else:
-                    response.failure("get_item_by_id failed")
-                return response.status_code == 401
+    def update_item(self) -> None:
+        if not self.item_ids:
+            return
+        item_id = random.choice(self.item_ids)
+        update_data = {"description": "Update description!", "stock": random.randint(1, 50)}
+        with self.client.patch(
+            f"/api/items/{item_id}",
+            headers=self.headers,
+            json=update_data,
+            name="/api/items/{item_id}",
+            catch_response=True,
+        ) as response:
+            self.check(response, 200, "update_item")
 
     @task(1)
-    @ensure_login
-    def delete_item(self) -> bool:
-        if self.item_ids:
-            item_id = random.choice(self.item_ids)
-            with self.client.delete(
-                f"/api/items/{item_id}", headers=self.headers, catch_response=True
-            ) as response:
-                if response.status_code == 204:
-                    response.success()
-                    self.item_ids.remove(item_id)
-                elif response.status_code == 401:
-                    response.success()
-                else:
-                    response.failure("get_item_by_id failed")
-                return response.status_code == 401
+    def delete_item(self) -> None:
+        if not self.item_ids:
+            return
+        item_id = random.choice(self.item_ids)
+        with self.client.delete(
+            f"/api/items/{item_id}",
+            headers=self.headers,
+            name="/api/items/{item_id}",
+            catch_response=True,
+        ) as response:
+            # 共用帳號時商品可能已被其他模擬使用者刪掉
+            if response.status_code == 404:
+                response.success()
+                self.item_ids.remove(item_id)
+            elif self.check(response, 204, "delete_item"):
+                self.item_ids.remove(item_id)
 
     @task(1)
-    @ensure_login
-    def get_all_users(self) -> bool:
+    def get_all_users(self) -> None:
         with self.client.get("/api/users", headers=self.headers, catch_response=True) as response:
-            if response.status_code == 200:
-                response.success()
-            return False
+            self.check(response, 200, "get_all_users")
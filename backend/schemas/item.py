@@ -95,3 +95,11 @@ class ItemUpdate(BaseModel):
     brand: ItemType.Brand | None = None
     description: ItemType.Description | None = None
     stock: ItemType.Stock | None = None
+
+
+class ItemBulkUpdate(ItemUpdate):
+    id: ItemType.Id
+
+
+class ItemBulkDelete(BaseModel):
+    ids: list[ItemType.Id]
@@ -1,8 +1,35 @@
+import base64
+import binascii
+
 from pydantic import BaseModel
 
+from exceptions.http import InvalidCursor_400
+
+# 分頁 API 單頁筆數上限
+MAX_PAGE_SIZE = 100
+
 
 class Pagination[T](BaseModel):
     total: int
     page: int
     page_size: int
     items: list[T]
+
+
+class CursorPagination[T](BaseModel):
+    total: int | None = None
+    page_size: int
+    next_cursor: str | None
+    items: list[T]
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as err:
+        raise InvalidCursor_400 from err
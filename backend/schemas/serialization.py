@@ -0,0 +1,42 @@
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter
+
+from config import settings
+
+
+@lru_cache
+def get_adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def build_model[M: BaseModel](model_cls: type[M], obj: Any) -> M:
+    """把 ORM 物件或 `Row` 轉成 response model。
+
+    開啟 `FAST_JSON_RESPONSES` 時，資料來自我們自己的資料庫、欄位型別已由 schema 保證，
+    直接 `model_construct` 跳過逐欄驗證；否則照常 `model_validate`。
+    """
+    if settings.get_settings().fast_json_responses:
+        return model_cls.model_construct(
+            **{name: getattr(obj, name) for name in model_cls.model_fields}
+        )
+    return model_cls.model_validate(obj)
+
+
+def build_models[M: BaseModel](model_cls: type[M], objs: Iterable[Any]) -> list[M]:
+    return [build_model(model_cls, obj) for obj in objs]
+
+
+def json_response(
+    content: BaseModel | list[BaseModel], status_code: int = status.HTTP_200_OK
+) -> Response:
+    # 由 pydantic-core 直接輸出 JSON bytes，不再經過 FastAPI 的二次驗證與 jsonable_encoder
+    tp = list[type(content[0])] if isinstance(content, list) and content else type(content)
+    return Response(
+        content=get_adapter(tp).dump_json(content),
+        status_code=status_code,
+        media_type="application/json",
+    )
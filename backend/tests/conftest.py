@@ -1,3 +1,5 @@
+import os
+
 import pytest
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
@@ -6,6 +8,38 @@ from sqlalchemy.pool import StaticPool
 
 from models.user import Base
 
+# 測試環境不讀 .env，補上 Settings 必要的環境變數
+os.environ.setdefault("APP_MODE", "TEST")
+os.environ.setdefault("PORT", "8000")
+os.environ.setdefault("RELOAD", "false")
+os.environ.setdefault("DATABASE_URI", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("ACCESS_TOKEN_SECRET", "test-access-secret")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+os.environ.setdefault("REFRESH_TOKEN_SECRET", "test-refresh-secret")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_MINUTES", "1440")
+# 測試在單一 process 中執行，回應快取可以使用記憶體後端
+os.environ.setdefault("WEB_WORKERS", "1")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--benchmark", action="store_true", help="執行 tests/test_benchmarks 的 micro-benchmark"
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "benchmark: 只在加上 --benchmark 時執行")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    # benchmark 要跑上千次，一般測試時略過
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="需要 --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
 
 @pytest.fixture(scope="module")
 def engine() -> AsyncEngine:
@@ -20,6 +54,8 @@ def engine() -> AsyncEngine:
 @pytest_asyncio.fixture(scope="function")
 async def create_tables(engine: AsyncEngine):
     from models.item import Item  # noqa: F401
+    from models.refresh_token import RefreshToken  # noqa: F401
+    from models.revocation import TokenRevocation  # noqa: F401
     from models.user import User  # noqa: F401
 
     async with engine.begin() as conn:
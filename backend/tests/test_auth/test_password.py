@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from auth.password import PasswordWorkerPool, hash_password, verify_password
+
+
+@pytest.fixture(scope="function")
+def pool():
+    pool = PasswordWorkerPool(max_workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestPasswordWorkerPool:
+    # 測試在 pool 中雜湊與驗證密碼
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self, pool: PasswordWorkerPool):
+        # When
+        hashed = await pool.run(hash_password, "password123")
+        # Then
+        assert await pool.run(verify_password, "password123", hashed)
+        assert not await pool.run(verify_password, "wrong", hashed)
+        assert pool.stats()["completed"] == 3
+        assert pool.stats()["in_flight"] == 0
+
+    # 測試排隊已滿時回 503
+    @pytest.mark.asyncio
+    async def test_reject_when_queue_full(self, pool: PasswordWorkerPool):
+        # Given (1 個執行中 + 1 個排隊中)
+        running = asyncio.create_task(pool.run(time.sleep, 0.2))
+        waiting = asyncio.create_task(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0)
+        # Then
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(time.sleep, 0)
+        assert exc_info.value.status_code == 503
+        assert pool.stats()["queued"] == 1
+        assert pool.stats()["rejected"] == 1
+        await asyncio.gather(running, waiting)
+
+    # 測試只計算成功的工作，被取消的請求要等 thread 結束才釋放名額
+    @pytest.mark.asyncio
+    async def test_failed_and_cancelled(self, pool: PasswordWorkerPool):
+        # Given
+        with pytest.raises(ValueError):
+            await pool.run(verify_password, "password123", "not-a-hash")
+        running = asyncio.create_task(pool.run(time.sleep, 0.2))
+        waiting = asyncio.create_task(pool.run(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        # When
+        running.cancel()
+        waiting.cancel()
+        for task in (running, waiting):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        await asyncio.sleep(0)
+        # Then: 排隊中的工作直接取消並釋放名額，執行中的仍在 thread 中跑
+        assert pool.stats()["in_flight"] == 1
+        await asyncio.sleep(0.3)
+        assert pool.stats()["in_flight"] == 0
+        # 只有在 thread 中跑完的那一個算完成
+        assert pool.stats()["completed"] == 1
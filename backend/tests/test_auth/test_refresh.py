@@ -0,0 +1,112 @@
+import asyncio
+import contextlib
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from auth.refresh import (
+    get_refresh_token_store,
+    issue_refresh_token,
+    purge_expired_refresh_tokens,
+    purge_periodically,
+    rotate_refresh_token,
+)
+from models.refresh_token import RefreshToken
+
+
+@pytest.fixture(scope="function")
+def refresh_store():
+    get_refresh_token_store.cache_clear()
+    yield get_refresh_token_store()
+    get_refresh_token_store.cache_clear()
+
+
+class TestRefreshTokenRotation:
+    # 測試輪替後簽發同家族的新 token，舊 token 標記為已使用
+    @pytest.mark.asyncio
+    async def test_rotate(self, session: AsyncSession, refresh_store):
+        # Given
+        payload = await issue_refresh_token(session, 1)
+        await session.commit()
+        # When
+        rotated = await rotate_refresh_token(session, payload)
+        await session.commit()
+        # Then
+        assert rotated is not None
+        assert rotated["fam"] == payload["fam"]
+        assert rotated["jti"] != payload["jti"]
+        old = await session.get(RefreshToken, payload["jti"])
+        assert old is not None and old.used
+        assert refresh_store.is_used(payload["jti"])
+
+    # 測試重複使用舊 token 會撤銷整個家族
+    @pytest.mark.asyncio
+    async def test_reuse_revokes_family(self, session: AsyncSession, refresh_store):
+        # Given
+        payload = await issue_refresh_token(session, 1)
+        await session.commit()
+        rotated = await rotate_refresh_token(session, payload)
+        await session.commit()
+        assert rotated is not None
+        refresh_store.used_tokens.clear()  # 模擬另一個 worker 收到重放的 token
+        # When
+        replayed = await rotate_refresh_token(session, payload)
+        await session.commit()
+        # Then
+        assert replayed is None
+        family = (
+            await session.scalars(
+                select(RefreshToken).where(RefreshToken.family_id == payload["fam"])
+            )
+        ).all()
+        assert len(family) == 2
+        assert all(token.revoked for token in family)
+        assert refresh_store.is_family_revoked(payload["fam"])
+        with pytest.raises(HTTPException) as exc_info:
+            await rotate_refresh_token(session, rotated)
+        assert exc_info.value.status_code == 401
+
+    # 測試輪替機制上線前簽發的 token 會被拒絕
+    @pytest.mark.asyncio
+    async def test_legacy_token(self, session: AsyncSession, refresh_store):
+        with pytest.raises(HTTPException) as exc_info:
+            await rotate_refresh_token(session, {"id": 1})
+        assert exc_info.value.status_code == 401
+
+    # 測試清除過期紀錄
+    @pytest.mark.asyncio
+    async def test_purge_expired(self, session: AsyncSession, refresh_store):
+        # Given
+        payload = await issue_refresh_token(session, 1)
+        await session.flush()
+        token = await session.get(RefreshToken, payload["jti"])
+        assert token is not None
+        token.expires_at = 0
+        await issue_refresh_token(session, 1)
+        await session.commit()
+        # When
+        purged = await purge_expired_refresh_tokens(session)
+        # Then
+        assert purged == 1
+
+    # 測試背景工作會定期清除過期紀錄
+    @pytest.mark.asyncio
+    async def test_purge_periodically(self, engine: AsyncEngine, session: AsyncSession):
+        # Given
+        payload = await issue_refresh_token(session, 1)
+        await session.flush()
+        token = await session.get(RefreshToken, payload["jti"])
+        assert token is not None
+        token.expires_at = 0
+        await session.commit()
+        # When
+        task = asyncio.create_task(purge_periodically(async_sessionmaker(engine), 0.01))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        # Then
+        session.expunge_all()
+        assert await session.get(RefreshToken, payload["jti"]) is None
@@ -0,0 +1,38 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.revocation import RevocationStore, ensure_not_revoked, get_revocation_store, revoke_tokens
+
+
+class TestRevocation:
+    # 測試撤銷後，先前簽發的 token 失效、之後簽發的仍有效
+    @pytest.mark.asyncio
+    async def test_revoke_tokens(self, session: AsyncSession):
+        # Given
+        old_payload = {"id": 1, "iat": time.time() - 10}
+        # When
+        await revoke_tokens(session, 1)
+        await session.commit()
+        new_payload = {"id": 1, "iat": time.time() + 1}
+        # Then
+        with pytest.raises(HTTPException) as exc_info:
+            await ensure_not_revoked(session, old_payload)
+        assert exc_info.value.status_code == 401
+        await ensure_not_revoked(session, new_payload)
+        get_revocation_store.cache_clear()
+
+    # 測試其他 worker 透過資料表同步撤銷清單
+    @pytest.mark.asyncio
+    async def test_refresh_from_database(self, session: AsyncSession):
+        # Given
+        await revoke_tokens(session, 2)
+        await session.commit()
+        store = RevocationStore(refresh_seconds=5, retention_seconds=3600)
+        # When
+        await store.refresh_if_stale(session)
+        # Then
+        assert store.is_revoked(2, time.time() - 10)
+        assert not store.is_revoked(3, time.time() - 10)
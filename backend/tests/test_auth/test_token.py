@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from auth.token import TokenService
+
+
+@pytest.fixture(scope="function")
+def token_service() -> TokenService:
+    return TokenService()
+
+
+class TestTokenService:
+    # 測試產生的 token 可以被解回原本的 payload
+    @pytest.mark.asyncio
+    async def test_round_trip(self, token_service: TokenService):
+        # When
+        token = await token_service.generate_token({"id": 1}, usage="access")
+        payload = await token_service.decode_token(token, usage="access")
+        # Then
+        assert payload["id"] == 1
+        assert payload["usage"] == "access"
+
+    # 測試與標準 JWT 函式庫互通
+    @pytest.mark.asyncio
+    async def test_compatible_with_jose(self, token_service: TokenService):
+        # Given
+        secret = "test-access-secret"
+        jose_token = jwt.encode({"id": 2, "usage": "access", "exp": time.time() + 60}, secret)
+        # When
+        token = await token_service.generate_token({"id": 1}, usage="access")
+        # Then
+        assert jwt.decode(token, secret)["id"] == 1
+        assert (await token_service.decode_token(jose_token, usage="access"))["id"] == 2
+
+    # 測試 usage 不符、簽章錯誤、過期的 token
+    @pytest.mark.asyncio
+    async def test_reject_invalid(self, token_service: TokenService):
+        # Given
+        refresh_token = await token_service.generate_token({"id": 1}, usage="refresh")
+        access_token = await token_service.generate_token({"id": 1}, usage="access")
+        expired_token = jwt.encode({"id": 1, "usage": "access", "exp": 1}, "test-access-secret")
+        # Then
+        for token, detail in [
+            (refresh_token, "無效的 Token"),
+            (access_token[:-2] + "xx", "無效的 Token"),
+            ("not-a-token", "無效的 Token"),
+            (expired_token, "Token 已過期"),
+        ]:
+            with pytest.raises(HTTPException) as exc_info:
+                await token_service.decode_token(token, usage="access")
+            assert exc_info.value.detail == detail
+
+    # 測試同一個 token 的其他 base64url 寫法 (多餘字元、補位、多出的位元) 都驗證失敗
+    @pytest.mark.asyncio
+    async def test_reject_non_canonical(self, token_service: TokenService):
+        # Given
+        token = await token_service.generate_token({"id": 1}, usage="access")
+        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+        # 簽章 32 bytes 編成 43 個字元，最後一個字元的低 2 位元是補位
+        padding_bits = alphabet[alphabet.index(token[-1]) ^ 1]
+        # Then
+        for variant in [token + "!", token + "=", token[:-1] + padding_bits, token + "+"]:
+            with pytest.raises(HTTPException) as exc_info:
+                await token_service.decode_token(variant, usage="access")
+            assert exc_info.value.detail == "無效的 Token"
+        assert len(token_service.codecs["access"].verified) == 0
+
+    # 測試驗證過的 token 會進快取
+    @pytest.mark.asyncio
+    async def test_verified_cache(self, token_service: TokenService):
+        # Given
+        token = await token_service.generate_token({"id": 1}, usage="access")
+        # When
+        await token_service.decode_token(token, usage="access")
+        await token_service.decode_token(token, usage="access")
+        # Then
+        assert token_service.codecs["access"].verified.stats()["hits"] == 1
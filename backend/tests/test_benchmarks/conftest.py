@@ -0,0 +1,80 @@
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import pytest
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    number: int
+    seconds: float
+    # 單次呼叫期間 tracemalloc 追蹤到的記憶體峰值增量 (平均)
+    alloc_bytes: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.number / self.seconds
+
+    @property
+    def us_per_op(self) -> float:
+        return self.seconds / self.number * 1e6
+
+
+RESULTS: list[BenchmarkResult] = []
+
+
+class Benchmark:
+    """量測一個 async callable：先暖機，計時 `number` 次，再以 tracemalloc 取樣記憶體配置。
+
+    計時與記憶體取樣分開跑，tracemalloc 的額外成本不會算進 ops/sec。
+    """
+
+    def __init__(self, warmup: int = 50, alloc_samples: int = 50) -> None:
+        self.warmup = warmup
+        self.alloc_samples = alloc_samples
+
+    async def __call__(
+        self, name: str, func: Callable[[], Awaitable[object]], number: int = 1000
+    ) -> BenchmarkResult:
+        for _ in range(self.warmup):
+            await func()
+
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            total = 0
+            for _ in range(self.alloc_samples):
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                await func()
+                total += tracemalloc.get_traced_memory()[1] - current
+        finally:
+            tracemalloc.stop()
+
+        result = BenchmarkResult(name, number, seconds, total / self.alloc_samples)
+        RESULTS.append(result)
+        return result
+
+
+@pytest.fixture
+def benchmark() -> Benchmark:
+    return Benchmark()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config) -> None:
+    if not RESULTS:
+        return
+    terminalreporter.write_sep("=", "benchmarks")
+    terminalreporter.write_line(f"{'layer':<44} {'ops/sec':>10} {'us/op':>10} {'alloc KiB':>10}")
+    for result in RESULTS:
+        terminalreporter.write_line(
+            f"{result.name:<44} {result.ops_per_second:>10.0f} "
+            f"{result.us_per_op:>10.1f} {result.alloc_bytes / 1024:>10.1f}"
+        )
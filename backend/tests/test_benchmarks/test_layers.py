@@ -0,0 +1,168 @@
+"""逐層量測 GET /api/items 的成本，改動單一層時可以比較前後差異。
+
+執行方式：`cd backend && python -m pytest tests/test_benchmarks --benchmark -q`
+"""
+
+from collections.abc import AsyncGenerator
+from datetime import date
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app import app
+from auth.token import get_token_service
+from crud.item import ItemCrud
+from database.session import ReadOnlySessionLocal, autocommit_engine
+from dependencies import get_current_user_with_token, get_item_read_crud, get_read_session
+from models.item import Item
+from models.user import User
+from schemas.item import ItemRead
+from schemas.misc import Pagination
+from schemas.serialization import build_models
+from tests.test_benchmarks.conftest import Benchmark
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.asyncio]
+
+ITEMS = 100
+PAGE_SIZE = 20
+
+
+# 建立擁有 ITEMS 件商品的使用者
+@pytest_asyncio.fixture(scope="function")
+async def user(session: AsyncSession) -> User:
+    user = User(
+        name="Bench User",
+        email="bench@example.com",
+        password="hashed_password",
+        age=25,
+        birthday=date(1998, 8, 8),
+        item_count=ITEMS,
+    )
+    session.add(user)
+    await session.flush()
+    await session.execute(
+        insert(Item),
+        [
+            {
+                "name": f"item{index}",
+                "price": 1.0,
+                "brand": "brand",
+                "description": "description",
+                "stock": 1,
+                "user_id": user.id,
+            }
+            for index in range(ITEMS)
+        ],
+    )
+    await session.commit()
+    return user
+
+
+@pytest_asyncio.fixture(scope="function")
+async def token(user: User) -> str:
+    return await get_token_service().generate_token({"id": user.id}, usage="access")
+
+
+# 唯讀請求使用的 session，連到 conftest 的 engine
+@pytest_asyncio.fixture(scope="function")
+async def read_session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, Any]:
+    async with ReadOnlySessionLocal(bind=autocommit_engine(engine)) as session:
+        yield session
+
+
+class TestLayers:
+    # TokenService.decode_token：驗證結果快取命中 / 未命中
+    async def test_decode_token(self, benchmark: Benchmark, token: str):
+        service = get_token_service()
+        codec = service.codecs["access"]
+        await benchmark(
+            "TokenService.decode_token (cached)",
+            lambda: service.decode_token(token, usage="access"),
+            number=20000,
+        )
+
+        async def uncached() -> dict[str, Any]:
+            codec.verified.clear()
+            return await service.decode_token(token, usage="access")
+
+        await benchmark("TokenService.decode_token (uncached)", uncached, number=20000)
+
+    # get_current_user_with_token：token 驗證 + 撤銷檢查 + 身分快取
+    async def test_current_user(
+        self, benchmark: Benchmark, read_session: AsyncSession, token: str, user: User
+    ):
+        dependency = get_current_user_with_token(usage="access")
+        service = get_token_service()
+        result = await benchmark(
+            "get_current_user_with_token",
+            lambda: dependency(token, read_session, service),
+            number=5000,
+        )
+        assert result.number == 5000
+
+    # ItemCrud.get_rows_by_user_id：一頁只 select 需要欄位的查詢
+    async def test_get_rows_by_user_id(
+        self, benchmark: Benchmark, read_session: AsyncSession, user: User
+    ):
+        crud = ItemCrud(read_session)
+        await benchmark(
+            "ItemCrud.get_rows_by_user_id",
+            lambda: crud.get_rows_by_user_id(user.id, limit=PAGE_SIZE, offset=0),
+            number=1000,
+        )
+
+    # Pagination[ItemRead] 的建立與 JSON 序列化
+    async def test_serialize_page(
+        self, benchmark: Benchmark, read_session: AsyncSession, user: User
+    ):
+        rows = await ItemCrud(read_session).get_rows_by_user_id(user.id, limit=PAGE_SIZE, offset=0)
+
+        async def serialize() -> bytes:
+            page = Pagination[ItemRead].model_construct(
+                total=ITEMS, page=1, page_size=PAGE_SIZE, items=build_models(ItemRead, rows)
+            )
+            return page.model_dump_json().encode()
+
+        await benchmark("Pagination[ItemRead] serialization", serialize, number=5000)
+
+    # 整個 handler：經過 ASGI、dependency 與回應快取
+    async def test_list_items_handler(
+        self, benchmark: Benchmark, engine: AsyncEngine, token: str, user: User
+    ):
+        async def read_session_override() -> AsyncGenerator[AsyncSession, Any]:
+            async with ReadOnlySessionLocal(bind=autocommit_engine(engine)) as session:
+                yield session
+
+        async def item_read_crud_override() -> AsyncGenerator[ItemCrud, Any]:
+            async with ReadOnlySessionLocal(bind=autocommit_engine(engine)) as session:
+                yield ItemCrud(session)
+
+        app.dependency_overrides[get_read_session] = read_session_override
+        app.dependency_overrides[get_item_read_crud] = item_read_crud_override
+        headers = {"Authorization": f"Bearer {token}"}
+        counter = iter(range(10**9))
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                await benchmark(
+                    "GET /api/items (response cache hit)",
+                    lambda: client.get(f"/api/items?page_size={PAGE_SIZE}", headers=headers),
+                    number=1000,
+                )
+                # 每次帶不同的 query string，回應快取都不會命中
+                await benchmark(
+                    "GET /api/items (response cache miss)",
+                    lambda: client.get(
+                        f"/api/items?page_size={PAGE_SIZE}&n={next(counter)}", headers=headers
+                    ),
+                    number=1000,
+                )
+                response = await client.get(f"/api/items?page_size={PAGE_SIZE}", headers=headers)
+                assert response.status_code == 200
+                assert len(response.json()["items"]) == PAGE_SIZE
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,102 @@
+from dataclasses import replace
+
+import pytest
+from fastapi import Request
+from pytest_mock import MockFixture
+
+from cache.backend import MemoryCacheBackend, NullCacheBackend
+from cache.response import ResponseCache, get_response_cache
+from config.settings import get_settings
+from schemas.user import UserRead
+
+
+def make_request(headers: dict[str, str] | None = None) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/users/1",
+            "query_string": b"",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        }
+    )
+
+
+@pytest.fixture(scope="function")
+def response_cache() -> ResponseCache:
+    return ResponseCache(MemoryCacheBackend(maxsize=100, ttl=60), ttl=60)
+
+
+class TestResponseCache:
+    # 測試第二次請求直接使用快取，且帶 If-None-Match 時回 304
+    @pytest.mark.asyncio
+    async def test_cache_and_etag(self, response_cache: ResponseCache):
+        # Given
+        calls = 0
+
+        async def build() -> UserRead:
+            nonlocal calls
+            calls += 1
+            return UserRead(id=1, name="a", email="a@example.com", age=20, birthday="2000-01-01")
+
+        # When
+        first = await response_cache.respond(make_request(), "users:1", build)
+        second = await response_cache.respond(
+            make_request({"If-None-Match": first.headers["etag"]}), "users:1", build
+        )
+        # Then
+        assert calls == 1
+        assert first.status_code == 200
+        assert second.status_code == 304
+
+    # 測試 namespace 失效後會重新計算
+    @pytest.mark.asyncio
+    async def test_invalidate(self, response_cache: ResponseCache):
+        # Given
+        names = iter(["before", "after"])
+
+        async def build() -> UserRead:
+            return UserRead(
+                id=1, name=next(names), email="a@example.com", age=20, birthday="2000-01-01"
+            )
+
+        first = await response_cache.respond(make_request(), "users:1", build)
+        # When
+        await response_cache.invalidate("users:1")
+        second = await response_cache.respond(make_request(), "users:1", build)
+        # Then
+        assert b"before" in first.body
+        assert b"after" in second.body
+        assert first.headers["etag"] != second.headers["etag"]
+
+    # 測試失效時留下短暫的寫入標記，供讀取分流判斷
+    @pytest.mark.asyncio
+    async def test_recently_written(self):
+        # Given
+        response_cache = ResponseCache(
+            MemoryCacheBackend(maxsize=100, ttl=60), ttl=60, written_ttl=5
+        )
+        # When
+        await response_cache.invalidate("items:1")
+        # Then
+        assert await response_cache.recently_written("items:1")
+        assert not await response_cache.recently_written("items:2")
+
+    # 測試多 worker 時不使用各自一份的記憶體快取，避免其他 worker 在寫入後回舊資料
+    @pytest.mark.parametrize(
+        ("workers", "backend"), [(1, MemoryCacheBackend), (5, NullCacheBackend)]
+    )
+    def test_memory_backend_per_worker(self, mocker: MockFixture, workers: int, backend: type):
+        # Given
+        mocker.patch(
+            "config.settings.get_settings",
+            return_value=replace(
+                get_settings(), response_cache_backend="memory", web_workers=workers
+            ),
+        )
+        get_response_cache.cache_clear()
+        # When
+        response_cache = get_response_cache()
+        # Then
+        assert isinstance(response_cache.backend, backend)
+        get_response_cache.cache_clear()
@@ -0,0 +1,46 @@
+import time
+
+from pytest_mock import MockFixture
+
+from cache.ttl import TTLCache
+
+
+class TestTTLCache:
+    # 測試命中與未命中計數
+    def test_hit_and_miss(self):
+        # Given
+        cache = TTLCache[str, int](maxsize=10, ttl=60)
+        cache.set("a", 1)
+        # When
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        # Then
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    # 測試過期資料不會被回傳
+    def test_expire(self, mocker: MockFixture):
+        # Given
+        now = time.monotonic()
+        mocker.patch("cache.ttl.time.monotonic", return_value=now)
+        cache = TTLCache[str, int](maxsize=10, ttl=60)
+        cache.set("a", 1, ttl=5)
+        # When
+        mocker.patch("cache.ttl.time.monotonic", return_value=now + 6)
+        # Then
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    # 測試容量滿時踢掉最久沒用的資料
+    def test_evict_lru(self):
+        # Given
+        cache = TTLCache[str, int](maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        # When
+        cache.set("c", 3)
+        # Then
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
@@ -0,0 +1,243 @@
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from crud.item import ItemCrud, reconcile_item_counts
+from models.user import User
+from schemas.item import ItemBulkUpdate, ItemCreate, ItemUpdate
+from schemas.misc import decode_cursor, encode_cursor
+
+
+# 建立 ItemCrud 實例
+@pytest_asyncio.fixture(scope="function")
+async def item_crud(session: AsyncSession) -> ItemCrud:
+    return ItemCrud(session)
+
+
+# 建立擁有商品的使用者
+@pytest_asyncio.fixture(scope="function")
+async def user(session: AsyncSession) -> User:
+    user = User(
+        name="Test User",
+        email="test@example.com",
+        password="hashed_password",
+        age=25,
+        birthday=date(1998, 8, 8),
+    )
+    session.add(user)
+    await session.flush()
+    return user
+
+
+# 建立測試用的商品資料
+@pytest.fixture(scope="function")
+def item_data() -> ItemCreate:
+    return ItemCreate(name="筆記型電腦", price=29999.0, brand="ASUS", stock=10)
+
+
+class TestItemCrud:
+    # 測試建立商品
+    @pytest.mark.asyncio
+    async def test_create_item(self, item_crud: ItemCrud, user: User, item_data: ItemCreate):
+        # When
+        item = await item_crud.create(item_data, user.id)
+        # Then
+        assert item.id is not None
+        assert item.user_id == user.id
+        assert item.name == item_data.name
+        assert item.price == item_data.price
+
+    # 測試取得他人商品時回 403
+    @pytest.mark.asyncio
+    async def test_get_by_id_and_validate_forbidden(
+        self, item_crud: ItemCrud, user: User, item_data: ItemCreate
+    ):
+        # Given
+        item = await item_crud.create(item_data, user.id)
+        # Then
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.get_by_id_and_validate(item.id, user.id + 1)
+        assert exc_info.value.status_code == 403
+
+    # 測試 keyset 分頁依序走完所有商品
+    @pytest.mark.asyncio
+    async def test_get_rows_by_user_id_after(
+        self, item_crud: ItemCrud, user: User, item_data: ItemCreate
+    ):
+        # Given
+        created_ids = [(await item_crud.create(item_data, user.id)).id for _ in range(5)]
+        # When
+        first_page = await item_crud.get_rows_by_user_id_after(user.id, limit=3)
+        second_page = await item_crud.get_rows_by_user_id_after(
+            user.id, limit=3, after_id=first_page[-1].id
+        )
+        # Then
+        assert [item.id for item in first_page + second_page] == sorted(created_ids, reverse=True)
+        assert len(second_page) == 2
+
+    # 測試唯讀查詢只回傳 ItemRead 需要的欄位
+    @pytest.mark.asyncio
+    async def test_get_rows(self, item_crud: ItemCrud, user: User, item_data: ItemCreate):
+        # Given
+        item = await item_crud.create(item_data, user.id)
+        # When
+        rows = await item_crud.get_rows_by_user_id(user.id, limit=10, offset=0)
+        row = await item_crud.get_row_by_id_and_validate(item.id, user.id)
+        # Then
+        assert [r.id for r in rows] == [item.id]
+        assert "created_at" not in rows[0]._fields
+        assert row.name == item_data.name
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.get_row_by_id_and_validate(item.id, user.id + 1)
+        assert exc_info.value.status_code == 403
+
+    # 測試部分更新自己的商品
+    @pytest.mark.asyncio
+    async def test_update_partial(self, item_crud: ItemCrud, user: User, item_data: ItemCreate):
+        # Given
+        item = await item_crud.create(item_data, user.id)
+        # When
+        updated_item = await item_crud.update_partial(item.id, user.id, ItemUpdate(stock=3))
+        # Then
+        assert updated_item.id == item.id
+        assert updated_item.stock == 3
+        assert updated_item.name == item_data.name  # 保持不變
+
+    # 測試更新不存在 / 他人的商品
+    @pytest.mark.asyncio
+    async def test_update_partial_not_found_or_forbidden(
+        self, item_crud: ItemCrud, user: User, item_data: ItemCreate
+    ):
+        # Given
+        item = await item_crud.create(item_data, user.id)
+        # Then
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.update_partial(999, user.id, ItemUpdate(stock=3))
+        assert exc_info.value.status_code == 404
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.update_partial(item.id, user.id + 1, ItemUpdate(stock=3))
+        assert exc_info.value.status_code == 403
+
+    # 測試刪除商品
+    @pytest.mark.asyncio
+    async def test_delete_item(self, item_crud: ItemCrud, user: User, item_data: ItemCreate):
+        # Given
+        item = await item_crud.create(item_data, user.id)
+        # When
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.delete(item.id, user.id + 1)
+        await item_crud.delete(item.id, user.id)
+        # Then
+        assert exc_info.value.status_code == 403
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.get_by_id_and_validate(item.id, user.id)
+        assert exc_info.value.status_code == 404
+
+    # 測試批次建立、更新、刪除商品
+    @pytest.mark.asyncio
+    async def test_bulk(self, item_crud: ItemCrud, user: User, item_data: ItemCreate):
+        # When
+        items = await item_crud.create_many([item_data] * 3, user.id)
+        item_ids = [item.id for item in items]
+        updated_items = await item_crud.update_many(
+            [ItemBulkUpdate(id=item_id, stock=5) for item_id in item_ids[:2]], user.id
+        )
+        await item_crud.delete_many(item_ids[:1], user.id)
+        # Then
+        assert len(set(item_ids)) == 3
+        assert all(item.user_id == user.id for item in items)
+        assert [item.stock for item in updated_items] == [5, 5]
+        assert await item_crud.count_by_user_id(user.id) == 2
+
+    # 測試批次操作他人或不存在的商品
+    @pytest.mark.asyncio
+    async def test_bulk_not_found_or_forbidden(
+        self, item_crud: ItemCrud, user: User, item_data: ItemCreate
+    ):
+        # Given
+        items = await item_crud.create_many([item_data] * 2, user.id)
+        item_ids = [item.id for item in items]
+        # Then
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.update_many([ItemBulkUpdate(id=item_ids[0], stock=1)], user.id + 1)
+        assert exc_info.value.status_code == 403
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.delete_many([*item_ids, 999], user.id)
+        assert exc_info.value.status_code == 404
+
+    # 測試批次刪除同時包含自己與他人的商品時回 403
+    @pytest.mark.asyncio
+    async def test_delete_many_mixed_ownership(
+        self, item_crud: ItemCrud, user: User, item_data: ItemCreate
+    ):
+        # Given
+        own = await item_crud.create(item_data, user.id)
+        other = await item_crud.create(item_data, user.id + 1)
+        # Then
+        with pytest.raises(HTTPException) as exc_info:
+            await item_crud.delete_many([own.id, other.id], user.id)
+        assert exc_info.value.status_code == 403
+
+    # 測試建立、刪除商品時同步維護使用者的商品數
+    @pytest.mark.asyncio
+    async def test_item_count(self, item_crud: ItemCrud, user: User, item_data: ItemCreate):
+        # When
+        item = await item_crud.create(item_data, user.id)
+        await item_crud.create_many([item_data] * 3, user.id)
+        await item_crud.delete(item.id, user.id)
+        # Then
+        assert await item_crud.count_by_user_id(user.id) == 3
+        assert await item_crud.count_by_user_id(user.id + 1) == 0
+
+    # 測試被拒絕的批次刪除不會改變商品數
+    @pytest.mark.asyncio
+    async def test_item_count_after_rejected_delete(
+        self, item_crud: ItemCrud, user: User, item_data: ItemCreate
+    ):
+        # Given
+        own = await item_crud.create_many([item_data] * 2, user.id)
+        other = await item_crud.create(item_data, user.id + 1)
+        # When
+        with pytest.raises(HTTPException):
+            await item_crud.delete_many([own[0].id, other.id], user.id)
+        # Then
+        assert await item_crud.count_by_user_id(user.id) == 2
+
+    # 測試修正計數器與實際商品數的偏差
+    @pytest.mark.asyncio
+    async def test_reconcile_item_counts(
+        self,
+        engine: AsyncEngine,
+        session: AsyncSession,
+        item_crud: ItemCrud,
+        user: User,
+        item_data: ItemCreate,
+    ):
+        # Given
+        await item_crud.create_many([item_data] * 2, user.id)
+        await session.execute(update(User).where(User.id == user.id).values(item_count=10))
+        await session.commit()
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        # When
+        repaired = await reconcile_item_counts(session_factory, batch_size=1)
+        repaired_again = await reconcile_item_counts(session_factory)
+        # Then
+        assert repaired == 1
+        assert repaired_again == 0
+        assert await item_crud.count_by_user_id(user.id) == 2
+
+
+class TestCursor:
+    # 測試游標編碼後可以解回原 id
+    def test_round_trip(self):
+        assert decode_cursor(encode_cursor(12345)) == 12345
+
+    # 測試無效游標回 400
+    def test_invalid_cursor(self):
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor!")
+        assert exc_info.value.status_code == 400
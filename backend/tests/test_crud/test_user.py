@@ -6,8 +6,9 @@ from fastapi import HTTPException
 from pytest_mock import MockFixture
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth.identity import get_identity_cache
 from crud.user import UserCrud
-from schemas.user import UserCreate, UserUpdate
+from schemas.user import UserCreate, UserRead, UserUpdate
 
 
 # 建立 UserCrud 實例
@@ -43,7 +44,9 @@ def user_data_2():
 
 @pytest.fixture(scope="function")
 def mock_hash_password(mocker: MockFixture) -> None:
-    mocker.patch("crud.user.hash_password", autospec=True, side_effect=lambda pw: "hashed_password")
+    mocker.patch(
+        "crud.user.hash_password_async", autospec=True, side_effect=lambda pw: "hashed_password"
+    )
 
 
 class TestUserCrud:
@@ -109,6 +112,24 @@ class TestUserCrud:
         with pytest.raises(HTTPException):
             await user_crud.get_by_id(999)
 
+    # 測試唯讀查詢不會取出密碼欄位
+    @pytest.mark.asyncio
+    async def test_get_row_by_id(
+        self,
+        user_crud: UserCrud,
+        user_data_1: UserCreate,
+        mock_hash_password,
+    ):
+        # Given
+        user = await user_crud.create(user_data_1)
+        # When
+        row = await user_crud.get_row_by_id(user.id)
+        # Then
+        assert row.email == user_data_1.email
+        assert "password" not in row._fields
+        with pytest.raises(HTTPException):
+            await user_crud.get_row_by_id(999)
+
     # 測試透過 email 獲取使用者
     @pytest.mark.asyncio
     async def test_get_by_email(
@@ -212,3 +233,58 @@ class TestUserCrud:
         # Then
         with pytest.raises(HTTPException):
             await user_crud.delete(999)
+
+    # 測試修改使用者後身分快取失效
+    @pytest.mark.asyncio
+    async def test_update_invalidates_identity_cache(
+        self,
+        user_crud: UserCrud,
+        user_data_1: UserCreate,
+        mock_hash_password,
+    ):
+        # Given
+        user = await user_crud.create(user_data_1)
+        identity_cache = get_identity_cache()
+        identity_cache.set(user.id, UserRead.model_validate(user))
+        # When
+        await user_crud.update_partial(user.id, UserUpdate(name="Updated Name"))
+        await user_crud.session.commit()
+        # Then
+        assert identity_cache.get(user.id) is None
+
+    # 測試分批串流所有使用者
+    @pytest.mark.asyncio
+    async def test_stream_all(
+        self,
+        user_crud: UserCrud,
+        user_data_1: UserCreate,
+        user_data_2: UserCreate,
+        mock_hash_password,
+    ):
+        # Given
+        await user_crud.create(user_data_1)
+        await user_crud.create(user_data_2)
+        # When
+        batches = [batch async for batch in user_crud.stream_all(batch_size=1)]
+        # Then
+        assert [len(batch) for batch in batches] == [1, 1]
+        assert [batch[0].email for batch in batches] == [user_data_1.email, user_data_2.email]
+
+    # 測試 keyset 分頁取得使用者
+    @pytest.mark.asyncio
+    async def test_get_page(
+        self,
+        user_crud: UserCrud,
+        user_data_1: UserCreate,
+        user_data_2: UserCreate,
+        mock_hash_password,
+    ):
+        # Given
+        user_1 = await user_crud.create(user_data_1)
+        user_2 = await user_crud.create(user_data_2)
+        # When
+        first_page = await user_crud.get_page(limit=1)
+        second_page = await user_crud.get_page(limit=1, after_id=first_page[-1].id)
+        # Then
+        assert [user.id for user in first_page] == [user_1.id]
+        assert [user.id for user in second_page] == [user_2.id]
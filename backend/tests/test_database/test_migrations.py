@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database.migrations import MIGRATIONS, add_item_count, get_current_version, migrate
+
+
+class TestMigrations:
+    # 測試 migration 會建立索引並記錄版本，重跑時不會重複套用
+    @pytest.mark.asyncio
+    async def test_migrate(self, engine: AsyncEngine, create_tables):
+        # When
+        applied = await migrate(engine)
+        applied_again = await migrate(engine)
+        # Then
+        assert applied == [migration.version for migration in MIGRATIONS]
+        assert applied_again == []
+        assert await get_current_version(engine) == MIGRATIONS[-1].version
+        async with engine.connect() as conn:
+            indexes = await conn.run_sync(lambda c: inspect(c).get_indexes("Item"))
+        assert "ix_Item_user_id_id" in {index["name"] for index in indexes}
+
+    # 測試既有的 User 表會補上 item_count 並以實際商品數回填
+    @pytest.mark.asyncio
+    async def test_add_item_count(self, engine: AsyncEngine, create_tables):
+        # Given: 尚未有 item_count 欄位的舊資料表
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    'INSERT INTO "User" (id, password, name, age, birthday, email, item_count, '
+                    "created_at, update_at) VALUES (1, 'x', 'a', 20, '2000-01-01', "
+                    "'a@example.com', 0, '2024-01-01', '2024-01-01')"
+                )
+            )
+            for _ in range(3):
+                await conn.execute(
+                    text(
+                        'INSERT INTO "Item" (name, price, brand, stock, user_id, created_at, '
+                        "update_at) VALUES ('n', 1, 'b', 1, 1, '2024-01-01', '2024-01-01')"
+                    )
+                )
+            await conn.execute(text('ALTER TABLE "User" DROP COLUMN item_count'))
+        # When
+        async with engine.begin() as conn:
+            await add_item_count(conn)
+        # Then
+        async with engine.connect() as conn:
+            count = await conn.scalar(text('SELECT item_count FROM "User" WHERE id = 1'))
+        assert count == 3
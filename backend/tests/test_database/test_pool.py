@@ -0,0 +1,65 @@
+from dataclasses import replace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import NullPool
+
+from config.settings import get_settings
+from database.pool import PGBOUNCER_POOL_SIZE, PoolMonitor, engine_options
+
+
+def make_settings(**changes):
+    return replace(
+        get_settings(), database_uri="postgresql+asyncpg://u:p@pgbouncer:6432/db", **changes
+    )
+
+
+class TestEngineOptions:
+    # 測試直連模式依 worker 數分配連線池，且保留 prepared statement 快取
+    def test_queue_mode(self):
+        options = engine_options(
+            make_settings(db_pool_mode="queue", db_max_connections=100, web_workers=5)
+        )
+        assert options["pool_size"] == 20
+        assert options["max_overflow"] == 0
+        assert "connect_args" not in options
+
+    # 測試 pgbouncer 模式只保留小型連線池 (上限不變)，關閉 prepared statement 快取並使用唯一名稱
+    def test_pgbouncer_mode(self):
+        options = engine_options(
+            make_settings(db_pool_mode="pgbouncer", db_max_connections=100, web_workers=5)
+        )
+        assert options["pool_size"] == PGBOUNCER_POOL_SIZE
+        assert options["pool_size"] + options["max_overflow"] == 20
+        connect_args = options["connect_args"]
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+    # 測試 null 模式不在程式內做連線池
+    def test_null_mode(self):
+        options = engine_options(make_settings(db_pool_mode="null"))
+        assert issubclass(options["poolclass"], NullPool)
+        assert "pool_size" not in options
+
+    # 測試未知模式
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            engine_options(make_settings(db_pool_mode="bogus"))
+
+
+class TestPoolMonitor:
+    # 測試連線池事件計數
+    @pytest.mark.asyncio
+    async def test_stats(self, engine: AsyncEngine):
+        # Given
+        monitor = PoolMonitor(engine, "queue")
+        # When
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        # Then
+        stats = monitor.stats()
+        assert stats["mode"] == "queue"
+        assert stats["checkouts"] == 1
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from database.replica import ReplicaRouter
+
+
+def make_router(
+    primary: AsyncEngine,
+    replicas: list[AsyncEngine],
+    written: set[str],
+    max_lag_seconds: float | None = None,
+):
+    async def recently_written(namespace: str) -> bool:
+        return namespace in written
+
+    return ReplicaRouter(
+        primary, replicas, recently_written, retry_seconds=30, max_lag_seconds=max_lag_seconds
+    )
+
+
+class TestReplicaRouter:
+    # 測試沒有 replica 時一律走主庫
+    @pytest.mark.asyncio
+    async def test_without_replicas(self, engine: AsyncEngine):
+        router = make_router(engine, [], set())
+        assert await router.choose("items:1") is engine
+
+    # 測試輪流使用 replica，剛寫入過的 namespace 走主庫
+    @pytest.mark.asyncio
+    async def test_round_robin_and_read_your_writes(self, engine: AsyncEngine, tmp_path: Path):
+        # Given
+        replicas = [
+            create_async_engine(f"sqlite+aiosqlite:///{tmp_path / f'replica{i}.db'}")
+            for i in range(2)
+        ]
+        router = make_router(engine, replicas, {"items:1"})
+        # When
+        chosen = {await router.choose("items:2") for _ in range(4)}
+        # Then
+        assert chosen == set(replicas)
+        assert await router.choose("items:1") is engine
+        for replica in replicas:
+            await replica.dispose()
+
+    # 測試連不上的 replica 會被標記為不健康，之後改走主庫
+    @pytest.mark.asyncio
+    async def test_failover(self, engine: AsyncEngine):
+        # Given
+        replica = create_async_engine("sqlite+aiosqlite:////nonexistent/dir/replica.db")
+        router = make_router(engine, [replica], set())
+        # When
+        chosen = await router.choose_reachable()
+        # Then
+        assert chosen is engine
+        assert router.healthy_replicas() == []
+        assert await router.choose() is engine
+        await replica.dispose()
+
+    # 測試複寫延遲超過門檻的 replica 暫停使用
+    @pytest.mark.asyncio
+    async def test_skip_lagging_replica(
+        self, engine: AsyncEngine, tmp_path: Path, mocker: MockFixture
+    ):
+        # Given
+        replicas = [
+            create_async_engine(f"sqlite+aiosqlite:///{tmp_path / f'replica{i}.db'}")
+            for i in range(2)
+        ]
+        router = make_router(engine, replicas, set(), max_lag_seconds=4)
+        lags = {replicas[0]: 10.0, replicas[1]: 0.5}
+        mocker.patch.object(router, "replica_lag", side_effect=lambda replica: lags[replica])
+        # When
+        chosen = {await router.choose("items:1") for _ in range(4)}
+        # Then
+        assert chosen == {replicas[1]}
+        for replica in replicas:
+            await replica.dispose()
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database.seed import distribute, seed
+from models.item import Item
+from models.user import User
+
+
+class TestSeed:
+    # 測試商品依 skew 分配且總數不變
+    def test_distribute(self):
+        assert distribute(10, 5, skew=0) == [2, 2, 2, 2, 2]
+        skewed = distribute(1000, 10, skew=1.5)
+        assert sum(skewed) == 1000
+        assert skewed == sorted(skewed, reverse=True)
+        assert skewed[0] > 10 * skewed[-1]
+
+    # 測試相同參數產生相同資料，--replace 會先清掉舊資料
+    @pytest.mark.asyncio
+    async def test_reproducible(self, engine: AsyncEngine, create_tables):
+        async def snapshot() -> list[tuple]:
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    select(User.email, Item.name, Item.price)
+                    .join(Item, Item.user_id == User.id)
+                    .order_by(Item.id)
+                )
+                return result.all()
+
+        options = {"users": 5, "items": 50, "seed": 7, "password_hash": "hash", "batch_size": 8}
+        stats = await seed(engine, **options)
+        first = await snapshot()
+        await seed(engine, **options, replace=True)
+
+        assert stats["items"] == 50
+        assert await snapshot() == first
+        async with engine.connect() as conn:
+            assert await conn.scalar(select(func.count()).select_from(User)) == 5
+            assert await conn.scalar(select(func.count()).select_from(Item)) == 50
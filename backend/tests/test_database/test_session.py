@@ -0,0 +1,87 @@
+from dataclasses import replace
+
+import pytest
+from pytest_mock import MockFixture
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from database import session as session_module
+from database.session import (
+    ReadOnlySessionLocal,
+    autocommit_engine,
+    get_replica_router,
+    init_db,
+    open_read_session,
+)
+from database.session import engine as main_engine
+from models.user import User
+
+
+class TestReadOnlySession:
+    # 測試每個查詢結束就歸還連線，不會留著交易
+    @pytest.mark.asyncio
+    async def test_release_after_query(self, engine: AsyncEngine, create_tables):
+        async with ReadOnlySessionLocal(bind=autocommit_engine(engine)) as session:
+            assert not session.in_transaction()
+            # When
+            users = (await session.execute(select(User.id))).all()
+            count = await session.scalar(text("SELECT COUNT(*) FROM User"))
+            # Then
+            assert users == []
+            assert count == 0
+            assert not session.in_transaction()
+
+    # 測試 replica 連不上時改用主庫重試，並標記 replica 不健康
+    @pytest.mark.asyncio
+    async def test_failover_to_primary(self):
+        # Given
+        replica = create_async_engine("sqlite+aiosqlite:////nonexistent/dir/replica.db")
+        router = get_replica_router()
+        # When
+        async with open_read_session(replica) as session:
+            value = await session.scalar(text("SELECT 1"))
+        # Then
+        assert value == 1
+        assert replica in router.unhealthy_until
+        router.unhealthy_until.clear()
+        await replica.dispose()
+
+    # 測試多 worker 時 replica 分流需要共用的回應快取 (寫入標記)
+    def test_replicas_require_shared_cache(self, mocker: MockFixture):
+        # Given
+        replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+        mocker.patch.object(session_module, "replica_engines", [replica])
+        mocker.patch.object(
+            session_module, "_settings", replace(session_module._settings, web_workers=5)
+        )
+        get_replica_router.cache_clear()
+        # Then
+        with pytest.raises(ValueError):
+            get_replica_router()
+        get_replica_router.cache_clear()
+
+
+class TestInitDb:
+    # 測試 schema 初始化可以重複執行，第二次不會再套用 migration
+    @pytest.mark.asyncio
+    async def test_init_db_idempotent(self):
+        # When
+        await init_db()
+        applied_again = await init_db()
+        # Then
+        assert applied_again == []
+        async with main_engine.connect() as conn:
+            tables = await conn.run_sync(lambda c: inspect(c).get_table_names())
+        assert {"User", "Item", "RefreshToken", "TokenRevocation"} <= set(tables)
+
+    # 測試 worker 啟動時記錄啟動耗時，且不會提早產生 OpenAPI schema
+    @pytest.mark.asyncio
+    async def test_startup_report(self):
+        from app import app, lifespan
+
+        async with lifespan(app):
+            startup = app.state.startup
+        assert startup["db_init_mode"] == "lock"
+        assert startup["lifespan_seconds"] >= 0
+        # OpenAPI schema 要等第一次請求 /openapi.json (/docs) 才產生
+        assert app.openapi_schema is None
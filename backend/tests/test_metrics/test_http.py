@@ -0,0 +1,26 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import app
+
+
+class TestMetricsEndpoint:
+    # 測試請求以路由樣板記錄，並可從 /metrics 讀到
+    @pytest.mark.asyncio
+    async def test_route_latency(self):
+        # Given
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            # When
+            await client.get("/api/config")
+            await client.get("/api/not-found")
+            response = await client.get("/metrics")
+        # Then
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert 'http_requests_total{method="GET",route="/api/config",status="200"}' in text
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/api/config",le=' in text
+        assert "password_hash_tasks" in text
+        assert 'route="/metrics"' not in text
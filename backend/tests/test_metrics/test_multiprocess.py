@@ -0,0 +1,38 @@
+import os
+from pathlib import Path
+
+from pytest_mock import MockFixture
+
+from metrics.multiprocess import MetricsStore, collect
+from metrics.registry import REGISTRY, Counter, Registry
+
+
+class TestMetricsStore:
+    # 測試從任一 worker 讀到的都是所有 worker 的總和
+    def test_collect_across_workers(self, tmp_path: Path, mocker: MockFixture):
+        # Given: 另一個 worker (pid 已結束) 留下的快照
+        store = MetricsStore(tmp_path)
+        other = Registry()
+        labelnames = ("method", "route", "status")
+        requests = other.register(Counter("http_requests_total", "HTTP requests", labelnames))
+        requests.inc("GET", "/api/items", "200", amount=3)
+        store.write(other.snapshot(), pid=os.getpid() + 100000)
+        mocker.patch("metrics.multiprocess.get_metrics_store", return_value=store)
+        own = REGISTRY.snapshot()["http_requests_total"]["samples"]
+        own_count = sum(value for labels, value in own if labels == ["GET", "/api/items", "200"])
+        # When
+        merged = collect()
+        # Then
+        samples = dict(merged["http_requests_total"]["samples"])
+        assert samples[("GET", "/api/items", "200")] == own_count + 3
+        assert store.path(os.getpid()).exists()
+
+    # 測試清除舊的快照檔
+    def test_clear(self, tmp_path: Path):
+        # Given
+        store = MetricsStore(tmp_path)
+        store.write(Registry().snapshot(), pid=1)
+        # When
+        store.clear()
+        # Then
+        assert store.read_all() == []
@@ -0,0 +1,50 @@
+import pytest
+
+from metrics.registry import Counter, Gauge, Histogram, Registry, merge, render
+
+
+class TestRegistry:
+    # 測試 histogram 以累計 bucket 輸出
+    def test_render_histogram(self):
+        # Given
+        registry = Registry()
+        histogram = registry.register(
+            Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        )
+        # When
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(3.0, "/a")
+        text = render(registry.snapshot())
+        # Then
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+        assert 'latency_seconds_sum{route="/a"} 3.55' in text
+
+    # 測試重複註冊同名 metric
+    def test_duplicate_name(self):
+        # Given
+        registry = Registry()
+        registry.register(Counter("requests_total", "Requests"))
+        # When / Then
+        with pytest.raises(ValueError):
+            registry.register(Counter("requests_total", "Requests"))
+
+    # 測試合併多個 worker：counter 全部相加，gauge 只算還活著的 worker
+    def test_merge(self):
+        # Given
+        snapshots = []
+        for in_progress in (2, 5):
+            registry = Registry()
+            registry.register(Counter("requests_total", "Requests", ("status",))).inc("200")
+            registry.register(Gauge("in_progress", "In progress")).set(in_progress)
+            snapshots.append(registry.snapshot())
+        # When
+        merged = merge([(snapshots[0], True), (snapshots[1], False)])
+        text = render(merged)
+        # Then
+        assert 'requests_total{status="200"} 2.0' in text
+        assert "in_progress 2.0" in text
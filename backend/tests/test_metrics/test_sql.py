@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from metrics.sql import QueryStats, QueryStatsMiddleware, current_stats, instrument_engine
+from models.item import Item
+from models.user import User
+
+
+class TestQueryStats:
+    # 測試統計 statement 數量，並偵測 relationship 的 N+1 lazy load
+    @pytest.mark.asyncio
+    async def test_count_and_n_plus_one(self, engine: AsyncEngine, session: AsyncSession):
+        # Given
+        instrument_engine(engine, slow_query_seconds=60)
+        for index in range(3):
+            user = User(
+                name=f"user{index}",
+                email=f"user{index}@example.com",
+                password="hashed_password",
+                age=25,
+                birthday=date(1998, 8, 8),
+            )
+            user.items.append(Item(name="item", price=1.0, brand="brand", stock=1))
+            session.add(user)
+        await session.commit()
+        session.expunge_all()
+        stats = QueryStats()
+        token = current_stats.set(stats)
+        # When
+        try:
+            users = (await session.scalars(select(User))).all()
+            await session.run_sync(lambda _: [len(user.items) for user in users])
+        finally:
+            current_stats.reset(token)
+        # Then: 1 個列表查詢 + 每個使用者各 1 個 lazy load
+        assert stats.count == 4
+        assert stats.n_plus_one(threshold=3) == {"User.items": 3}
+        assert stats.n_plus_one(threshold=4) == {}
+
+    # 測試 Server-Timing header，串流回應 (header 送出時統計還不完整) 不加
+    @pytest.mark.asyncio
+    async def test_server_timing(self, engine: AsyncEngine):
+        # Given
+        instrument_engine(engine, slow_query_seconds=60)
+        app = FastAPI()
+
+        @app.get("/ping")
+        async def ping():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+            return {}
+
+        @app.get("/stream")
+        async def stream():
+            async def rows():
+                async with engine.connect() as conn:
+                    for value in range(2):
+                        yield str((await conn.execute(text(f"SELECT {value}"))).scalar())
+
+            return StreamingResponse(rows())
+
+        app.add_middleware(QueryStatsMiddleware)
+        # When
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/ping")
+            streamed = await client.get("/stream")
+        # Then
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert response.headers["server-timing"].endswith('desc="2 queries"')
+        assert streamed.text == "01"
+        assert "server-timing" not in streamed.headers
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+from pytest_mock import MockFixture
+
+from schemas.item import ItemRead
+from schemas.serialization import build_models, json_response
+
+
+@pytest.fixture(scope="function")
+def rows() -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(id=i, name=f"item{i}", price=1.5, brand="ASUS", description="d", stock=i)
+        for i in range(3)
+    ]
+
+
+class TestSerialization:
+    # 測試快速路徑與一般路徑輸出相同的 JSON
+    @pytest.mark.parametrize("fast", [False, True])
+    def test_same_output(self, mocker: MockFixture, rows: list[SimpleNamespace], fast: bool):
+        # Given
+        mocker.patch(
+            "config.settings.get_settings",
+            return_value=SimpleNamespace(fast_json_responses=fast),
+        )
+        encoded = [ItemRead.model_validate(row).model_dump_json().encode() for row in rows]
+        expected = b"[" + b",".join(encoded) + b"]"
+        # When
+        response = json_response(build_models(ItemRead, rows))
+        # Then
+        assert response.body == expected
+        assert response.media_type == "application/json"
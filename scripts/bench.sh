@@ -0,0 +1,8 @@
+#!/usr/bin/env sh
+# 依序執行所有 benchmark 情境，任一情境違反 SLO 或相對 baseline 退步即失敗
+# 用法：scripts/bench.sh [--host http://localhost:8000] [其他 performance.benchmark 參數]
+set -e
+cd "$(dirname "$0")/../backend"
+for scenario in read-heavy write-heavy login-storm deep-pagination bulk-import; do
+    python -m performance.benchmark "$scenario" "$@"
+done